@@ -1,7 +1,20 @@
 """CastMasta - LLM agent for controlling AirPlay and Google Cast devices."""
 
-from .agent import CastAgent
+from typing import TYPE_CHECKING
+
 from .config import AgentConfig, DeviceConfig
 
+if TYPE_CHECKING:
+    from .agent import CastAgent
+
 __version__ = "0.2.0"
 __all__ = ["CastAgent", "AgentConfig", "DeviceConfig"]
+
+
+def __getattr__(name):
+    # CastAgent pulls in pyatv and pychromecast; import it on first access.
+    if name == "CastAgent":
+        from .agent import CastAgent
+
+        return CastAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,26 @@
 """CastMasta unified agent for AirPlay and Google Cast devices."""
 
 import asyncio
+import collections
+import functools
 import ipaddress
 import logging
 import math
 import os
-import re
 import shutil
+import stat
+import string
 import sys
-import tempfile
+import time
 import wave
 from pathlib import Path
-from typing import Optional
-from urllib.parse import urlparse
+from typing import Callable, Optional
+from urllib.parse import urlsplit
 
 import pyatv
 import pychromecast
+import zeroconf
+from pyatv import conf
 from pyatv.const import Protocol
 
 from .airplay_backend import AirPlayBackend
@@ -23,41 +28,169 @@ from .backend import DeviceBackend
 from .cast_backend import GoogleCastBackend
 from .config import AgentConfig
 from .credentials import CredentialStore
-from .tools import get_tool_definitions
+from .file_server import FileServer
+from .media_cache import MediaCache
+from .tools import VALID_KEYS, get_tool_definitions
 
 logger = logging.getLogger(__name__)
 
-ALLOWED_MEDIA_EXTENSIONS = {
+ALLOWED_MEDIA_EXTENSIONS = frozenset({
     ".mp3", ".wav", ".flac", ".ogg", ".mp4", ".m4a", ".aac", ".m4v", ".mov",
-}
+})
+
+ALLOWED_IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"})
 
-ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
+ALLOWED_URL_SCHEMES = frozenset({"http", "https"})
 
-ALLOWED_URL_SCHEMES = {"http", "https"}
+# Rendered once for the "Unsupported ... type" errors.
+_ALLOWED_MEDIA_MSG = ", ".join(sorted(ALLOWED_MEDIA_EXTENSIONS))
+_ALLOWED_IMAGE_MSG = ", ".join(sorted(ALLOWED_IMAGE_EXTENSIONS))
 
 MAX_SCAN_TIMEOUT = 30
+# A targeted Cast browse gives up once this many seconds pass without a new device.
+CAST_QUIET_PERIOD = 1.0
+# Extra seconds past the requested timeout before a hung discovery is abandoned.
+SCAN_GRACE_PERIOD = 5
+PAIRING_SESSION_TTL = 120
 MIN_DISPLAY_DURATION = 1
 MAX_DISPLAY_DURATION = 86400
+# Part of the display_image cache key; change it when the ffmpeg encoding changes.
+_STILL_VIDEO_FORMAT = b"h264-1fps-stillimage"
 
 _USER_VOICE_DIR = Path.home() / ".local/share/piper-voices"
 _SYSTEM_VOICE_DIR = Path("/usr/share/castmasta/voices")
 PIPER_VOICE_DATA_DIR = _USER_VOICE_DIR if _USER_VOICE_DIR.exists() else _SYSTEM_VOICE_DIR
 DEFAULT_VOICE = "en_US-lessac-medium"
 MAX_ANNOUNCE_TEXT_LEN = 4000
-_VOICE_RE = re.compile(r"^[a-zA-Z0-9_\-]+$")
+_VOICE_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
 PIPER_BIN = shutil.which("piper") or str(Path(sys.executable).parent / "piper")
 
 
+AIRPLAY_PORT = 7000
+COMPANION_PORT = 49153
+
+# Service to pair for each supported protocol.
+_PAIRING_SERVICE_FACTORIES: dict[Protocol, Callable[[str], object]] = {
+    Protocol.AirPlay: lambda identifier: conf.AirPlayService(identifier, port=AIRPLAY_PORT),
+    Protocol.Companion: lambda identifier: conf.CompanionService(port=COMPANION_PORT),
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_address(address: str) -> ipaddress.IPv4Address:
+    """Parse an IPv4 address string, memoised for repeated pair/scan calls."""
+    return ipaddress.IPv4Address(address)
+
+
+_PLAIN_NUMBER_TYPES = (int, float)
+
+
+def _is_finite_number(value) -> bool:
+    """True for non-bool ints and floats that are neither NaN nor infinite."""
+    return (
+        isinstance(value, _PLAIN_NUMBER_TYPES)
+        and not isinstance(value, bool)
+        and not math.isnan(value)
+        and not math.isinf(value)
+    )
+
+
+def _stat_regular_file(file_path: str, symlink_error: str, missing_error: str) -> Path:
+    """Return the resolved path of a regular, non-symlink file using a single lstat."""
+    try:
+        st = os.lstat(file_path)
+    except OSError:
+        raise FileNotFoundError(missing_error) from None
+    if stat.S_ISLNK(st.st_mode):
+        raise ValueError(symlink_error)
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(missing_error)
+    # The file itself is not a symlink, but a parent directory may be.
+    return Path(os.path.realpath(file_path))
+
+
+_WAV_COPY_FRAMES = 65536
+
+
 def _prepend_silence(wav_path: str, seconds: float = 1.5) -> None:
-    """Prepend silence to a WAV file in-place to absorb RAOP stream startup latency."""
-    with wave.open(wav_path, "rb") as src:
-        params = src.getparams()
-        audio = src.readframes(src.getnframes())
-    silence_frames = int(params.framerate * seconds)
-    silence = b"\x00" * silence_frames * params.nchannels * params.sampwidth
-    with wave.open(wav_path, "wb") as dst:
-        dst.setparams(params)
-        dst.writeframes(silence + audio)
+    """Prepend silence to a WAV file in-place to absorb RAOP stream startup latency.
+
+    The audio is copied in chunks into a sibling file with the final frame
+    count already in its header, so it is never held in memory at once.
+    """
+    tmp_path = wav_path + ".tmp"
+    try:
+        with wave.open(wav_path, "rb") as src:
+            params = src.getparams()
+            silence_frames = int(params.framerate * seconds)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+            with open(fd, "wb") as f, wave.open(f, "wb") as dst:
+                dst.setparams(params._replace(nframes=params.nframes + silence_frames))
+                dst.writeframesraw(bytes(silence_frames * params.nchannels * params.sampwidth))
+                while chunk := src.readframes(_WAV_COPY_FRAMES):
+                    dst.writeframesraw(chunk)
+        os.replace(tmp_path, wav_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _cast_device(info) -> dict:
+    """Build a scan result from a pychromecast ``CastInfo``."""
+    return {
+        "name": info.friendly_name,
+        "address": str(info.host),
+        "identifier": str(info.uuid),
+        "device_type": "googlecast",
+        "protocols": ["googlecast"],
+    }
+
+
+async def _render_still_video(image_path: Path, duration: int, out_path: str) -> None:
+    """Encode a still image as an H.264 MP4 of ``duration`` seconds.
+
+    The image is looped at 1 fps rather than ffmpeg's default 25, and
+    x264 is tuned for static content, so an hour-long still costs 3600
+    near-empty frames instead of 90000.
+    """
+    # Using create_subprocess_exec (not shell) for safety - no injection risk
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loop", "1", "-framerate", "1", "-i", str(image_path),
+        "-c:v", "libx264", "-preset", "ultrafast", "-tune", "stillimage",
+        "-t", str(duration), "-r", "1",
+        # yuv420p needs even dimensions.
+        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart", "-y", out_path,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed (exit {proc.returncode}): {stderr.decode(errors='replace')}"
+        )
+
+
+async def _render_speech(text: str, voice: str, out_path: str) -> None:
+    """Synthesise ``text`` with piper into a WAV file, led by a short silence."""
+    proc = await asyncio.create_subprocess_exec(
+        PIPER_BIN,
+        "--model", voice,
+        "--data-dir", str(PIPER_VOICE_DATA_DIR),
+        "--output_file", out_path,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate(input=text.encode())
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"piper failed (exit {proc.returncode}): {stderr.decode(errors='replace')}"
+        )
+    _prepend_silence(out_path)
 
 
 class CastAgent:
@@ -67,10 +200,54 @@ class CastAgent:
         self.config = config or AgentConfig()
         self.devices: dict[str, DeviceBackend] = {}
         self.credentials = CredentialStore(self.config.storage_path)
-        self._pairing_handlers: dict[str, object] = {}
+        # Shared by every Cast backend, so concurrent casts use one port.
+        self.file_server = FileServer(port=self.config.cast_file_server_port)
+        # Cached files being streamed: counts for backends reading them
+        # directly (AirPlay); the Cast file server tracks its own.
+        self._streaming: collections.Counter[Path] = collections.Counter()
+        self.media_cache = MediaCache(
+            self.credentials.storage_path.parent / "cache",
+            self.config.media_cache_max_bytes,
+            in_use=self._media_in_use,
+        )
+        # Open pairing sessions and the timers that close them after
+        # PAIRING_SESSION_TTL if pair_with_pin() never comes.
+        self._pairing_handlers: dict[tuple[str, Protocol], tuple[object, asyncio.TimerHandle]] = {}
+        self._expiring_handlers: set[asyncio.Task] = set()
         self._last_scan: list[dict] = []
+        self._last_scan_time: Optional[float] = None
+        self._devices_by_name: dict[str, dict] = {}
+        self._device_types: dict[str, str] = {}
+        # pyatv configs and CastInfo records from earlier scans, so
+        # connect() can skip a rescan.
+        self._airplay_configs: dict[str, object] = {}
+        self._cast_infos: dict[str, object] = {}
+        self._scan_task: Optional[asyncio.Future] = None
+
+    def _scan_cache_fresh(self) -> bool:
+        return (
+            self._last_scan_time is not None
+            and time.monotonic() - self._last_scan_time < self.config.scan_cache_ttl
+        )
 
-    async def scan(self, timeout: int = 10, hosts: Optional[list] = None) -> list[dict]:
+    async def scan(
+        self, timeout: int = 10, hosts: Optional[list] = None, refresh: bool = False,
+    ) -> list[dict]:
+        """Scan for devices, reusing a full scan younger than ``scan_cache_ttl``.
+
+        Concurrent full scans share one discovery run instead of each
+        sweeping the network.
+        """
+        if hosts:
+            return await self._run_scan(timeout, hosts)
+        if not refresh and self._scan_cache_fresh():
+            return self._last_scan
+        if self._scan_task is None or self._scan_task.done():
+            self._scan_task = asyncio.ensure_future(self._run_scan(timeout))
+        # Shielded so one caller giving up doesn't cancel the others' scan.
+        return await asyncio.shield(self._scan_task)
+
+    async def _run_scan(self, timeout: int, hosts: Optional[list] = None) -> list[dict]:
         timeout = max(1, min(timeout, MAX_SCAN_TIMEOUT))
         async def _empty():
             return []
@@ -80,55 +257,146 @@ class CastAgent:
             self._scan_cast(timeout) if not hosts else _empty(),
         )
         self._last_scan = airplay_devices + cast_devices
+        self._devices_by_name = {}
+        for dev in self._last_scan:
+            # Keep the first match, as the old linear search did.
+            self._devices_by_name.setdefault(dev["name"], dev)
+        self._device_types = {dev["identifier"]: dev["device_type"] for dev in self._last_scan}
+        # Host-targeted scans only cover part of the network, so they don't count.
+        self._last_scan_time = None if hosts else time.monotonic()
         return self._last_scan
 
-    async def _scan_airplay(self, timeout: int, hosts: Optional[list] = None) -> list[dict]:
+    async def _scan_airplay(
+        self, timeout: int, hosts: Optional[list] = None,
+        identifier: Optional[str] = None,
+    ) -> list[dict]:
         try:
             kwargs = {}
             if hosts:
-                import ipaddress
-                kwargs["hosts"] = [ipaddress.IPv4Address(h) for h in hosts]
-            atvs = await pyatv.scan(loop=asyncio.get_event_loop(), timeout=timeout, **kwargs)
-            results = []
+                kwargs["hosts"] = [_parse_address(h) for h in hosts]
+            if identifier:
+                # pyatv ends the multicast browse as soon as this device answers.
+                kwargs["identifier"] = identifier
+            atvs = await asyncio.wait_for(
+                pyatv.scan(loop=asyncio.get_running_loop(), timeout=timeout, **kwargs),
+                timeout + SCAN_GRACE_PERIOD,
+            )
             for atv in atvs:
-                services = atv.services if hasattr(atv, "services") else []
-                results.append({
+                self._airplay_configs[atv.identifier] = atv
+            return [
+                {
                     "name": atv.name,
                     "address": str(atv.address),
                     "identifier": atv.identifier,
                     "device_type": "airplay",
-                    "protocols": [s.protocol.name for s in services],
-                })
-            return results
+                    "protocols": [s.protocol.name for s in getattr(atv, "services", ())],
+                }
+                for atv in atvs
+            ]
         except Exception:
             logger.exception("AirPlay scan failed")
             return []
 
+    async def _browse_cast(
+        self, timeout: float, stop_when: Optional[Callable[[object], bool]] = None,
+    ) -> list:
+        """Browse for Cast devices and return their ``CastInfo`` records.
+
+        Browsing ends at ``timeout`` or as soon as ``stop_when`` accepts a
+        discovered device; with ``stop_when`` it also ends once
+        ``CAST_QUIET_PERIOD`` passes without a new device. A full browse runs
+        to ``timeout``, since AirPlay discovery takes that long anyway and
+        late answers would otherwise be dropped.
+        Discovery callbacks arrive on zeroconf's thread and only wake the loop,
+        so no executor thread is held for the scan window.
+        """
+        loop = asyncio.get_running_loop()
+        added = asyncio.Event()
+        listener = pychromecast.discovery.SimpleCastListener(
+            add_callback=lambda uuid, service: loop.call_soon_threadsafe(added.set),
+        )
+        zconf = await asyncio.to_thread(zeroconf.Zeroconf)
+        browser = pychromecast.discovery.CastBrowser(listener, zconf)
+        try:
+            await asyncio.to_thread(browser.start_discovery)
+        except Exception:
+            zconf.close()
+            raise
+        try:
+            deadline = loop.time() + timeout
+            while (remaining := deadline - loop.time()) > 0:
+                infos = list(browser.devices.values())
+                if stop_when is not None and any(stop_when(info) for info in infos):
+                    break
+                quiet_exit = stop_when is not None and bool(infos)
+                try:
+                    await asyncio.wait_for(
+                        added.wait(), min(remaining, CAST_QUIET_PERIOD) if quiet_exit else remaining,
+                    )
+                except asyncio.TimeoutError:
+                    if quiet_exit:
+                        break
+                added.clear()
+            return list(browser.devices.values())
+        finally:
+            # Also closes the zeroconf instance.
+            await asyncio.to_thread(browser.stop_discovery)
+
     async def _scan_cast(self, timeout: int) -> list[dict]:
         try:
-            chromecasts, browser = await asyncio.to_thread(
-                pychromecast.get_chromecasts, timeout=timeout,
+            cast_infos = await asyncio.wait_for(
+                self._browse_cast(timeout), timeout + SCAN_GRACE_PERIOD,
+            )
+        except Exception:
+            logger.exception("Google Cast scan failed")
+            return []
+        self._remember_cast_infos(cast_infos)
+        return [_cast_device(info) for info in cast_infos]
+
+    async def _find_cast(self, name: str, timeout: int) -> list[dict]:
+        """Browse for a single Cast device by name, returning as soon as it answers."""
+        try:
+            cast_infos = await asyncio.wait_for(
+                self._browse_cast(timeout, stop_when=lambda info: info.friendly_name == name),
+                timeout + SCAN_GRACE_PERIOD,
             )
-            await asyncio.to_thread(browser.stop_discovery)
-            results = []
-            for cc in chromecasts:
-                results.append({
-                    "name": cc.cast_info.friendly_name,
-                    "address": str(cc.cast_info.host),
-                    "identifier": str(cc.uuid),
-                    "device_type": "googlecast",
-                    "protocols": ["googlecast"],
-                })
-            return results
         except Exception:
             logger.exception("Google Cast scan failed")
             return []
+        self._remember_cast_infos(cast_infos)
+        return [_cast_device(info) for info in cast_infos if info.friendly_name == name]
+
+    def _remember_cast_infos(self, cast_infos: list) -> None:
+        for info in cast_infos:
+            self._cast_infos[str(info.uuid)] = info
+
+    async def find_device(
+        self, name: str, timeout: int = 10, hosts: Optional[list] = None,
+    ) -> Optional[dict]:
+        """Find a device by name, ending discovery early when possible.
+
+        pyatv can only stop a multicast browse early for a known identifier,
+        so devices seen in a previous scan are re-probed by identifier (or by
+        friendly name for Cast) unless that scan is still fresh. Unknown names
+        fall back to a full scan.
+        """
+        known = self._devices_by_name.get(name)
+        if known is not None and not hosts:
+            if self._scan_cache_fresh():
+                return known
+            if known["device_type"] == "googlecast":
+                found = await self._find_cast(name, timeout)
+            else:
+                found = await self._scan_airplay(timeout, identifier=known["identifier"])
+            dev = next((d for d in found if d["name"] == name), None)
+            if dev is not None:
+                self._devices_by_name[name] = dev
+                return dev
+        await self.scan(timeout, hosts=hosts, refresh=True)
+        return self._devices_by_name.get(name)
 
     def _resolve_device_type(self, identifier: str) -> Optional[str]:
-        for dev in self._last_scan:
-            if dev["identifier"] == identifier:
-                return dev["device_type"]
-        return None
+        return self._device_types.get(identifier)
 
     async def connect(
         self, identifier: str, address: str, name: str,
@@ -141,13 +409,16 @@ class CastAgent:
             device_type = "airplay"
 
         if device_type == "googlecast":
-            backend = GoogleCastBackend(
-                file_server_port=self.config.cast_file_server_port,
+            backend = GoogleCastBackend(file_server=self.file_server)
+            await backend.connect(
+                identifier, address, name, cast_info=self._cast_infos.get(identifier),
             )
-            await backend.connect(identifier, address, name)
         else:
             backend = AirPlayBackend(credentials=self.credentials)
-            await backend.connect(identifier, address, name, protocol=protocol)
+            await backend.connect(
+                identifier, address, name, protocol=protocol,
+                config=self._airplay_configs.get(identifier),
+            )
 
         self.devices[identifier] = backend
         return backend
@@ -156,24 +427,45 @@ class CastAgent:
         self, name: str, protocol: Protocol = Protocol.AirPlay,
         hosts: Optional[list] = None,
     ) -> tuple[str, DeviceBackend]:
-        devices = await self.scan(hosts=hosts)
-        for dev in devices:
-            if dev["name"] == name:
-                backend = await self.connect(
-                    dev["identifier"], dev["address"], dev["name"],
-                    protocol=protocol, device_type=dev["device_type"],
-                )
-                return dev["identifier"], backend
-        raise ValueError(f"Device '{name}' not found")
+        dev = await self.find_device(name, hosts=hosts)
+        if dev is None:
+            raise ValueError(f"Device '{name}' not found")
+        backend = await self.connect(
+            dev["identifier"], dev["address"], dev["name"],
+            protocol=protocol, device_type=dev["device_type"],
+        )
+        return dev["identifier"], backend
 
     async def disconnect(self, identifier: str):
         if identifier in self.devices:
             await self.devices[identifier].disconnect()
             del self.devices[identifier]
+        self._last_scan_time = None
+
+    async def _close_one(self, identifier: str):
+        backend = self.devices.pop(identifier, None)
+        if backend is not None:
+            await backend.disconnect()
 
     async def disconnect_all(self):
-        for identifier in list(self.devices.keys()):
-            await self.disconnect(identifier)
+        identifiers = list(self.devices)
+        results = await asyncio.gather(
+            *(self._close_one(i) for i in identifiers), return_exceptions=True,
+        )
+        for identifier, result in zip(identifiers, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to disconnect %s: %s", identifier, result)
+        self._last_scan_time = None
+
+    async def aclose(self):
+        """Disconnect devices, close pairing sessions and the file server, and flush credentials."""
+        await self.disconnect_all()
+        for identifier, protocol in list(self._pairing_handlers):
+            await self._close_handler(identifier, protocol)
+        if self._expiring_handlers:
+            await asyncio.gather(*self._expiring_handlers, return_exceptions=True)
+        await self.file_server.shutdown()
+        await self.credentials.aclose()
 
     def _get_backend(self, identifier: str) -> DeviceBackend:
         if identifier not in self.devices:
@@ -190,36 +482,83 @@ class CastAgent:
         if device_type == "googlecast":
             raise ValueError("Pairing is not required for Google Cast devices.")
 
-        from pyatv import conf, pair as pyatv_pair
-        device_config = conf.AppleTV(
-            address=ipaddress.IPv4Address(address), name=name,
+        handler, fresh = await self._get_or_create_handler(
+            identifier, address, name, protocol,
         )
-        # AirPlayService sets the device identifier (required by pyatv storage layer)
-        device_config.add_service(conf.AirPlayService(identifier, port=7000))
-        if protocol == Protocol.AirPlay:
-            pass  # already added above
-        elif protocol == Protocol.Companion:
-            device_config.add_service(conf.CompanionService(port=49153))
-        else:
-            raise ValueError(f"Unsupported protocol for pairing: {protocol}")
-        handler = await pyatv_pair(device_config, protocol, loop=asyncio.get_event_loop())
-        await handler.begin()
-
-        handler_key = f"{identifier}:{protocol.name}"
-        self._pairing_handlers[handler_key] = handler
+        if fresh:
+            try:
+                await handler.begin()
+            except Exception:
+                await self._close_handler(identifier, protocol)
+                raise
 
         if not handler.device_provides_pin:
             return {"status": "pin_required", "message": "Enter PIN on the device itself"}
         return {"status": "ready", "message": "PIN required - use pair_with_pin method"}
 
+    async def _get_or_create_handler(
+        self, identifier: str, address: str, name: str, protocol: Protocol,
+    ) -> tuple[object, bool]:
+        """Return ``(handler, fresh)`` for a pairing session.
+
+        A begun, unfinished session is reused, so calling pair() again doesn't
+        redo pyatv's pairing setup. Sessions are closed PAIRING_SESSION_TTL
+        seconds after they start, releasing pyatv's sockets and responders.
+        """
+        factory = _PAIRING_SERVICE_FACTORIES.get(protocol)
+        if factory is None:
+            raise ValueError(f"Unsupported protocol for pairing: {protocol}")
+
+        entry = self._pairing_handlers.get((identifier, protocol))
+        if entry is not None:
+            handler = entry[0]
+            if not handler.has_paired:
+                return handler, False
+            await self._close_handler(identifier, protocol)
+
+        device_config = conf.AppleTV(
+            address=_parse_address(address), name=name,
+        )
+        # AirPlayService sets the device identifier (required by pyatv storage layer)
+        device_config.add_service(_PAIRING_SERVICE_FACTORIES[Protocol.AirPlay](identifier))
+        if protocol != Protocol.AirPlay:
+            device_config.add_service(factory(identifier))
+        loop = asyncio.get_running_loop()
+        handler = await pyatv.pair(device_config, protocol, loop=loop)
+        expiry = loop.call_later(
+            PAIRING_SESSION_TTL, self._expire_handler, identifier, protocol,
+        )
+        self._pairing_handlers[(identifier, protocol)] = (handler, expiry)
+        return handler, True
+
+    def _expire_handler(self, identifier: str, protocol: Protocol):
+        task = asyncio.ensure_future(self._close_expired(identifier, protocol))
+        # Hold a reference until done; the loop only keeps weak ones.
+        self._expiring_handlers.add(task)
+        task.add_done_callback(self._expiring_handlers.discard)
+
+    async def _close_expired(self, identifier: str, protocol: Protocol):
+        logger.debug("Pairing session for %s expired", identifier)
+        try:
+            await self._close_handler(identifier, protocol)
+        except Exception:
+            logger.warning("Failed to close expired pairing session for %s", identifier, exc_info=True)
+
+    async def _close_handler(self, identifier: str, protocol: Protocol):
+        entry = self._pairing_handlers.pop((identifier, protocol), None)
+        if entry is not None:
+            handler, expiry = entry
+            expiry.cancel()
+            await handler.close()
+
     async def pair_with_pin(
         self, identifier: str, address: str, name: str, pin: str,
         protocol: Protocol = Protocol.AirPlay,
     ) -> bool:
-        handler_key = f"{identifier}:{protocol.name}"
-        handler = self._pairing_handlers.get(handler_key)
-        if handler is None:
+        entry = self._pairing_handlers.get((identifier, protocol))
+        if entry is None:
             raise ValueError(f"No active pairing session for {identifier}. Call pair() first.")
+        handler = entry[0]
 
         try:
             handler.pin(pin)
@@ -231,8 +570,7 @@ class CastAgent:
                 return True
             return False
         finally:
-            await handler.close()
-            self._pairing_handlers.pop(handler_key, None)
+            await self._close_handler(identifier, protocol)
 
     # --- Power ---
 
@@ -257,7 +595,7 @@ class CastAgent:
         await self._get_backend(identifier).stop()
 
     async def play_url(self, identifier: str, url: str, **kwargs):
-        parsed = urlparse(url)
+        parsed = urlsplit(url)
         if parsed.scheme not in ALLOWED_URL_SCHEMES:
             raise ValueError(f"URL scheme '{parsed.scheme}' not allowed. Use http or https.")
         if not parsed.hostname:
@@ -276,27 +614,12 @@ class CastAgent:
         path = self._validate_image_file(image_path)
         backend = self._get_backend(identifier)
 
-        fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
-        os.close(fd)
-        os.chmod(tmp_path, 0o600)
-        try:
-            # Using create_subprocess_exec (not shell) for safety - no injection risk
-            proc = await asyncio.create_subprocess_exec(
-                "ffmpeg", "-loop", "1", "-i", str(path),
-                "-c:v", "libx264", "-t", str(duration),
-                "-pix_fmt", "yuv420p", "-y", tmp_path,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            _, stderr = await proc.communicate()
-            if proc.returncode != 0:
-                raise RuntimeError(
-                    f"ffmpeg failed (exit {proc.returncode}): {stderr.decode(errors='replace')}"
-                )
-            await backend.stream_file(tmp_path)
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        image = await asyncio.to_thread(path.read_bytes)
+        video = await self.media_cache.get_or_render(
+            "still", MediaCache.key(_STILL_VIDEO_FORMAT, image, str(duration).encode()), ".mp4",
+            functools.partial(_render_still_video, path, duration),
+        )
+        await self._stream_cached(backend, video)
 
     async def announce(
         self, identifier: str, text: str, voice: str = DEFAULT_VOICE,
@@ -305,7 +628,7 @@ class CastAgent:
             raise ValueError("text must be a non-empty string.")
         if len(text) > MAX_ANNOUNCE_TEXT_LEN:
             raise ValueError(f"text too long (max {MAX_ANNOUNCE_TEXT_LEN} chars).")
-        if not voice or not _VOICE_RE.match(voice):
+        if not voice or not _VOICE_CHARS.issuperset(voice):
             raise ValueError("voice must be a simple model name (letters, digits, hyphens, underscores only).")
 
         backend = self._get_backend(identifier)
@@ -317,29 +640,29 @@ class CastAgent:
             except Exception:
                 pass
 
-        fd, tmp_path = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)
-        os.chmod(tmp_path, 0o600)
+        wav = await self.media_cache.get_or_render(
+            "tts", MediaCache.key(voice.encode(), text.encode()), ".wav",
+            functools.partial(_render_speech, text, voice),
+        )
+        await self._stream_cached(backend, wav)
+
+    def _media_in_use(self) -> set[Path]:
+        """Cached files that must not be evicted: being streamed or served."""
+        return {*self._streaming, *self.file_server.served_paths()}
+
+    async def _stream_cached(self, backend: DeviceBackend, path: Path):
+        """Stream a media-cache file, keeping it from eviction while the backend reads it.
+
+        For Cast, stream_file returns once playback starts and the file server
+        protects the file from then on.
+        """
+        self._streaming[path] += 1
         try:
-            proc = await asyncio.create_subprocess_exec(
-                PIPER_BIN,
-                "--model", voice,
-                "--data-dir", str(PIPER_VOICE_DATA_DIR),
-                "--output_file", tmp_path,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            _, stderr = await proc.communicate(input=text.encode())
-            if proc.returncode != 0:
-                raise RuntimeError(
-                    f"piper failed (exit {proc.returncode}): {stderr.decode(errors='replace')}"
-                )
-            _prepend_silence(tmp_path)
-            await backend.stream_file(tmp_path)
+            await backend.stream_file(str(path))
         finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            self._streaming[path] -= 1
+            if not self._streaming[path]:
+                del self._streaming[path]
 
     # --- Volume ---
 
@@ -349,15 +672,11 @@ class CastAgent:
 
     async def volume_up(self, identifier: str, delta: float = 0.1):
         self._validate_delta(delta)
-        backend = self._get_backend(identifier)
-        current = await backend.get_volume()
-        await backend.set_volume(min(1.0, current + delta))
+        await self._get_backend(identifier).change_volume(delta)
 
     async def volume_down(self, identifier: str, delta: float = 0.1):
         self._validate_delta(delta)
-        backend = self._get_backend(identifier)
-        current = await backend.get_volume()
-        await backend.set_volume(max(0.0, current - delta))
+        await self._get_backend(identifier).change_volume(-delta)
 
     async def get_volume(self, identifier: str) -> float:
         return await self._get_backend(identifier).get_volume()
@@ -373,6 +692,8 @@ class CastAgent:
     # --- Remote (AirPlay-only) ---
 
     async def send_key(self, identifier: str, key: str):
+        if key not in VALID_KEYS:
+            raise ValueError(f"Unknown key: {key}. Valid keys: {', '.join(sorted(VALID_KEYS))}")
         backend = self._get_backend(identifier)
         if backend.device_type != "airplay":
             raise ValueError("send_key is not supported on Google Cast devices.")
@@ -381,43 +702,49 @@ class CastAgent:
     # --- Validation helpers ---
 
     def _validate_media_file(self, file_path: str) -> Path:
-        unresolved = Path(file_path)
-        if unresolved.is_symlink():
-            raise ValueError("Symlinks are not allowed for streaming.")
-        path = unresolved.resolve()
-        if not path.is_file():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        path = _stat_regular_file(
+            file_path,
+            "Symlinks are not allowed for streaming.",
+            f"File not found: {file_path}",
+        )
         if path.suffix.lower() not in ALLOWED_MEDIA_EXTENSIONS:
             raise ValueError(
                 f"Unsupported file type '{path.suffix}'. "
-                f"Allowed: {', '.join(sorted(ALLOWED_MEDIA_EXTENSIONS))}"
+                f"Allowed: {_ALLOWED_MEDIA_MSG}"
             )
         return path
 
     def _validate_image_file(self, image_path: str) -> Path:
-        unresolved = Path(image_path)
-        if unresolved.is_symlink():
-            raise ValueError("Symlinks are not allowed for image display.")
-        path = unresolved.resolve()
-        if not path.is_file():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        path = _stat_regular_file(
+            image_path,
+            "Symlinks are not allowed for image display.",
+            f"Image file not found: {image_path}",
+        )
         if path.suffix.lower() not in ALLOWED_IMAGE_EXTENSIONS:
             raise ValueError(
                 f"Unsupported image type '{path.suffix}'. "
-                f"Allowed: {', '.join(sorted(ALLOWED_IMAGE_EXTENSIONS))}"
+                f"Allowed: {_ALLOWED_IMAGE_MSG}"
             )
         return path
 
+    # The fast path is one type check plus a chained compare: NaN and +/-inf
+    # both fail the range test, so the finite-number checks only run to pick
+    # the error message (and for int/float subclasses).
+
     @staticmethod
     def _validate_volume(volume: float):
-        if isinstance(volume, bool) or not isinstance(volume, (int, float)) or math.isnan(volume) or math.isinf(volume):
+        if type(volume) in _PLAIN_NUMBER_TYPES and 0.0 <= volume <= 1.0:
+            return
+        if not _is_finite_number(volume):
             raise ValueError("Volume must be a finite number.")
         if not (0.0 <= volume <= 1.0):
             raise ValueError(f"Volume must be between 0.0 and 1.0, got {volume}")
 
     @staticmethod
     def _validate_delta(delta: float):
-        if isinstance(delta, bool) or not isinstance(delta, (int, float)) or math.isnan(delta) or math.isinf(delta):
+        if type(delta) in _PLAIN_NUMBER_TYPES and 0.0 < delta <= 1.0:
+            return
+        if not _is_finite_number(delta):
             raise ValueError("Delta must be a finite number.")
         if not (0.0 < delta <= 1.0):
             raise ValueError(f"Delta must be between 0.0 and 1.0, got {delta}")
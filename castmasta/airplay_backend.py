@@ -5,11 +5,13 @@ import logging
 from typing import Optional
 
 import pyatv
+from pyatv import conf
 from pyatv.const import Protocol
 from pyatv.storage.memory_storage import MemoryStorage
 
 from .backend import DeviceBackend
 from .credentials import CredentialStore
+from .tools import VALID_KEYS
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,9 @@ class _PinnedPortStorage(MemoryStorage):
 
 _storage = _PinnedPortStorage()
 
+# Playing attributes copied verbatim into now_playing().
+_NOW_PLAYING_FIELDS = ("title", "artist", "album", "position", "total_time")
+
 
 class AirPlayBackend(DeviceBackend):
     """Backend for AirPlay devices (Apple TV, HomePod, AV receivers, etc.)."""
@@ -40,9 +45,28 @@ class AirPlayBackend(DeviceBackend):
         self._atv = None
         self._credentials = credentials
 
-    async def connect(self, identifier: str, address: str, name: str, **kwargs) -> None:
+    async def connect(
+        self, identifier: str, address: str, name: str,
+        config: Optional[conf.BaseConfig] = None, **kwargs,
+    ) -> None:
+        """Connect to the device.
+
+        ``config`` is a pyatv configuration from an earlier scan; when its
+        address still matches it is used directly instead of re-scanning
+        ``address``. A failed connect with it falls back to a fresh scan.
+        """
+        if config is not None and str(config.address) == address:
+            try:
+                await self._connect_target(config, identifier, name)
+                return
+            except Exception as e:
+                logger.debug("Connect with scanned config for %s failed, rescanning: %s", name, e)
+        target = await self._scan_target(identifier, address, name)
+        await self._connect_target(target, identifier, name)
+
+    async def _scan_target(self, identifier: str, address: str, name: str) -> conf.BaseConfig:
         atvs = await pyatv.scan(
-            loop=asyncio.get_event_loop(), timeout=10, hosts=[address],
+            loop=asyncio.get_running_loop(), timeout=10, hosts=[address],
         )
         target = next((a for a in atvs if a.name == name), None)
         if target is None:
@@ -50,16 +74,19 @@ class AirPlayBackend(DeviceBackend):
             target = next((a for a in atvs if str(a.identifier) == identifier), None)
         if target is None:
             raise ValueError(f"AirPlay device '{name}' not found at {address}")
+        return target
 
+    async def _connect_target(self, target: conf.BaseConfig, identifier: str, name: str) -> None:
         if self._credentials:
+            stored = self._credentials.get_all(identifier)
             for proto in (Protocol.AirPlay, Protocol.RAOP, Protocol.Companion):
-                creds = self._credentials.get(identifier, proto.name)
+                creds = stored.get(proto.name)
                 if creds:
                     target.set_credentials(proto, creds)
                     logger.debug("Loaded %s credentials for %s", proto.name, name)
 
         self._atv = await pyatv.connect(
-            target, loop=asyncio.get_event_loop(), storage=_storage,
+            target, loop=asyncio.get_running_loop(), storage=_storage,
         )
         logger.info("Connected to AirPlay device: %s", name)
 
@@ -94,15 +121,13 @@ class AirPlayBackend(DeviceBackend):
 
     async def now_playing(self) -> dict:
         playing = await self._atv.metadata.playing()
-        return {
+        info = {
             "media_type": playing.media_type.name,
             "device_state": playing.device_state.name,
-            "title": playing.title,
-            "artist": playing.artist,
-            "album": playing.album,
-            "position": playing.position,
-            "total_time": playing.total_time,
         }
+        for field in _NOW_PLAYING_FIELDS:
+            info[field] = getattr(playing, field)
+        return info
 
     async def power_on(self) -> None:
         try:
@@ -118,13 +143,6 @@ class AirPlayBackend(DeviceBackend):
 
     async def send_key(self, key: str) -> None:
         """Send a remote control key press (AirPlay-specific)."""
-        rc = self._atv.remote_control
-        key_map = {
-            "up": rc.up, "down": rc.down, "left": rc.left, "right": rc.right,
-            "select": rc.select, "menu": rc.menu, "home": rc.home,
-            "play": rc.play, "pause": rc.pause, "play_pause": rc.play_pause,
-            "next": rc.next, "previous": rc.previous,
-        }
-        if key not in key_map:
+        if key not in VALID_KEYS:
             raise ValueError(f"Unknown key: {key}")
-        await key_map[key]()
+        await getattr(self._atv.remote_control, key)()
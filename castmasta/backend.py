@@ -51,6 +51,14 @@ class DeviceBackend(ABC):
     async def get_volume(self) -> float:
         """Get current volume level (0.0 to 1.0)."""
 
+    async def change_volume(self, delta: float) -> None:
+        """Adjust volume by ``delta``, clamped to 0.0-1.0.
+
+        Backends that can read and write the volume in one step override this.
+        """
+        current = await self.get_volume()
+        await self.set_volume(max(0.0, min(1.0, current + delta)))
+
     @abstractmethod
     async def now_playing(self) -> dict:
         """Get currently playing media information."""
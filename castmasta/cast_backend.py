@@ -1,38 +1,102 @@
 """Google Cast backend using pychromecast."""
 
 import asyncio
+import dataclasses
 import logging
 import mimetypes
 from typing import Optional
+from uuid import UUID
 
 import pychromecast
+from pychromecast.models import CastInfo, HostServiceInfo
 
 from .backend import DeviceBackend
 from .file_server import FileServer
 
 logger = logging.getLogger(__name__)
 
+CAST_PORT = 8009
+# Seconds to wait for a directly dialled device before falling back to
+# discovery.
+DIRECT_CONNECT_TIMEOUT = 10
+
+
+def _play_and_wait(mc, url: str, content_type: str) -> None:
+    """Start playback and wait for the session, in one worker-thread hop."""
+    mc.play_media(url, content_type)
+    mc.block_until_active()
+
+
+def _address_cast_info(identifier: str, address: str, name: str) -> Optional[CastInfo]:
+    """Describe a device known only by address, assuming the default Cast port."""
+    try:
+        uuid = UUID(identifier)
+    except ValueError:
+        return None
+    # cast_type is left unset; Chromecast() asks the device for it.
+    return CastInfo(set(), uuid, None, name, address, CAST_PORT, None, None)
+
+
+def _dial(cast_info: CastInfo) -> pychromecast.Chromecast:
+    """Connect to ``cast_info``'s host and port without zeroconf; blocking."""
+    # Scanned services are mDNS records that need a live zeroconf instance
+    # to resolve, so dial the known host and port instead.
+    host_info = dataclasses.replace(
+        cast_info, services={HostServiceInfo(cast_info.host, cast_info.port)},
+    )
+    cc = pychromecast.Chromecast(cast_info=host_info)
+    try:
+        cc.wait(DIRECT_CONNECT_TIMEOUT)
+    except Exception:
+        cc.disconnect()
+        raise
+    return cc
+
 
 class GoogleCastBackend(DeviceBackend):
     """Backend for Google Cast devices (Chromecast, Google Home, etc.)."""
 
     device_type = "googlecast"
 
-    def __init__(self, file_server_port: int = 8089):
+    def __init__(self, file_server_port: int = 8089, file_server: Optional[FileServer] = None):
+        """``file_server`` may be shared between backends; otherwise one is
+        created on ``file_server_port`` and shut down on disconnect()."""
         self._cast = None
         self._browser = None
-        self._file_server = FileServer(port=file_server_port)
+        self._owns_file_server = file_server is None
+        self._file_server = file_server or FileServer(port=file_server_port)
         self._file_server_port = file_server_port
+        self._served_url: Optional[str] = None
+
+    async def connect(
+        self, identifier: str, address: str, name: str,
+        cast_info: Optional[CastInfo] = None, **kwargs,
+    ) -> None:
+        """Connect to the device.
+
+        The device is dialled directly at ``address``, using ``cast_info``
+        from an earlier scan when its host still matches, or else the
+        default Cast port. Discovery by name is only used if that fails.
+        """
+        if cast_info is None or str(cast_info.host) != address:
+            cast_info = _address_cast_info(identifier, address, name)
+        if cast_info is not None:
+            try:
+                self._cast = await asyncio.to_thread(_dial, cast_info)
+                logger.info("Connected to Google Cast device: %s", name)
+                return
+            except Exception as e:
+                logger.debug("Direct connect to %s failed, rediscovering: %s", address, e)
 
-    async def connect(self, identifier: str, address: str, name: str, **kwargs) -> None:
         chromecasts, browser = await asyncio.to_thread(
             pychromecast.get_listed_chromecasts,
             friendly_names=[name],
         )
-        self._browser = browser
-
         for cc in chromecasts:
             if str(cc.uuid) == identifier or cc.name == name:
+                # Casts found by discovery resolve their host through the
+                # browser's zeroconf instance, so it stays up until disconnect.
+                self._browser = browser
                 self._cast = cc
                 await asyncio.to_thread(cc.wait)
                 logger.info("Connected to Google Cast device: %s", name)
@@ -42,27 +106,34 @@ class GoogleCastBackend(DeviceBackend):
             await asyncio.to_thread(browser.stop_discovery)
         raise ValueError(f"Google Cast device '{name}' not found")
 
+    def _release_file(self) -> None:
+        if self._served_url is not None:
+            self._file_server.release(self._served_url)
+            self._served_url = None
+
     async def disconnect(self) -> None:
-        await self._file_server.shutdown()
+        # The steps are independent, so run them concurrently.
+        self._release_file()
+        steps = []
+        if self._owns_file_server:
+            steps.append(self._file_server.shutdown())
         if self._cast:
-            await asyncio.to_thread(self._cast.disconnect)
+            steps.append(asyncio.to_thread(self._cast.disconnect))
             self._cast = None
         if self._browser:
-            await asyncio.to_thread(self._browser.stop_discovery)
+            steps.append(asyncio.to_thread(self._browser.stop_discovery))
             self._browser = None
+        await asyncio.gather(*steps)
 
     async def stream_file(self, file_path: str) -> None:
-        url = await self._file_server.serve_file(file_path)
+        self._release_file()
         content_type = mimetypes.guess_type(file_path)[0] or "video/mp4"
-        mc = self._cast.media_controller
-        await asyncio.to_thread(mc.play_media, url, content_type)
-        await asyncio.to_thread(mc.block_until_active)
+        url = self._served_url = await self._file_server.serve_file(file_path, content_type)
+        await asyncio.to_thread(_play_and_wait, self._cast.media_controller, url, content_type)
 
     async def play_url(self, url: str, **kwargs) -> None:
         content_type = kwargs.get("content_type", "video/mp4")
-        mc = self._cast.media_controller
-        await asyncio.to_thread(mc.play_media, url, content_type)
-        await asyncio.to_thread(mc.block_until_active)
+        await asyncio.to_thread(_play_and_wait, self._cast.media_controller, url, content_type)
 
     async def play(self) -> None:
         await asyncio.to_thread(self._cast.media_controller.play)
@@ -72,7 +143,7 @@ class GoogleCastBackend(DeviceBackend):
 
     async def stop(self) -> None:
         await asyncio.to_thread(self._cast.media_controller.stop)
-        await self._file_server.shutdown()
+        self._release_file()
 
     async def seek(self, position: float) -> None:
         await asyncio.to_thread(self._cast.media_controller.seek, position)
@@ -83,6 +154,14 @@ class GoogleCastBackend(DeviceBackend):
     async def get_volume(self) -> float:
         return await asyncio.to_thread(lambda: self._cast.status.volume_level)
 
+    async def change_volume(self, delta: float) -> None:
+        def change():
+            # status is the receiver's last pushed state, so no extra round trip.
+            current = self._cast.status.volume_level
+            self._cast.set_volume(max(0.0, min(1.0, current + delta)))
+
+        await asyncio.to_thread(change)
+
     async def now_playing(self) -> dict:
         status = await asyncio.to_thread(lambda: self._cast.media_controller.status)
         return {
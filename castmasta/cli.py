@@ -1,29 +1,106 @@
 """CLI interface for CastMasta."""
 
 import asyncio
-import json
+import functools
+import shlex
+import sys
+from typing import TYPE_CHECKING
 
 import click
 
-from castmasta import CastAgent
-from pyatv.const import Protocol
+from castmasta import serialization
+from castmasta.tools import VALID_KEYS, get_tools_json
 
+if TYPE_CHECKING:
+    from castmasta import CastAgent
 
-@click.group()
+# pyatv and the agent stack are imported on first use so that --help and
+# the tools command don't pay for them.
+# CLI protocol name -> pyatv Protocol member name.
+_PROTO_MEMBERS = {"airplay": "AirPlay", "companion": "Companion"}
+_PROTO_NAMES = tuple(_PROTO_MEMBERS)
+
+
+class _ProtocolChoice(click.Choice):
+    """A protocol name that converts straight to its ``Protocol`` member.
+
+    With ``allow_all``, ``"all"`` is also accepted and converts to None.
+    """
+
+    def __init__(self, allow_all: bool = False):
+        super().__init__([*_PROTO_NAMES, "all"] if allow_all else _PROTO_NAMES)
+
+    def convert(self, value, param, ctx):
+        if not isinstance(value, str):
+            return value  # already converted, e.g. a default
+        name = super().convert(value, param, ctx)
+        if name == "all":
+            return None
+        from pyatv.const import Protocol
+
+        return Protocol[_PROTO_MEMBERS[name]]
+
+
+_PROTOCOL = _ProtocolChoice()
+
+
+def _get_agent(ctx: click.Context) -> "CastAgent":
+    """Return the group's agent, creating it on first use."""
+    obj = ctx.find_root().obj
+    if "agent" not in obj:
+        from castmasta import CastAgent
+
+        obj["agent"] = CastAgent()
+    return obj["agent"]
+
+
+def _async_command(fn):
+    """Run an ``async def`` command body on the group's shared event loop."""
+    @functools.wraps(fn)
+    def wrapper(ctx, *args, **kwargs):
+        return ctx.obj["loop"].run_until_complete(fn(ctx, *args, **kwargs))
+
+    return wrapper
+
+
+def _close_loop(ctx: click.Context, loop: asyncio.AbstractEventLoop):
+    """Close the agent and tear the shared loop down, as asyncio.run would."""
+    try:
+        agent = ctx.obj.get("agent")
+        if agent is not None:
+            # Disconnects devices, stops the file server and flushes credentials.
+            loop.run_until_complete(agent.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+@click.group(
+    context_settings={"help_option_names": ["-h", "--help"], "auto_envvar_prefix": "CASTMASTA"},
+)
 @click.pass_context
 def cli(ctx):
     """CastMasta - Control AirPlay and Google Cast devices."""
     ctx.ensure_object(dict)
-    ctx.obj["agent"] = CastAgent()
+    loop = asyncio.new_event_loop()
+    # Installed as the current loop so library code calling
+    # asyncio.get_event_loop() outside a coroutine gets this one.
+    asyncio.set_event_loop(loop)
+    ctx.obj["loop"] = loop
+    ctx.call_on_close(lambda: _close_loop(ctx, loop))
 
 
 @cli.command()
 @click.option("--timeout", "-t", default=10.0, help="Scan timeout in seconds")
+@click.option("--refresh", is_flag=True, help="Scan again even if a recent result is cached")
 @click.pass_context
-def scan(ctx, timeout):
+@_async_command
+async def scan(ctx, timeout, refresh):
     """Scan for AirPlay and Google Cast devices on the network."""
-    agent: CastAgent = ctx.obj["agent"]
-    devices = asyncio.run(agent.scan(timeout))
+    agent: CastAgent = _get_agent(ctx)
+    devices = await agent.scan(timeout, refresh=refresh)
     if devices:
         click.echo("Found devices:")
         for dev in devices:
@@ -37,55 +114,34 @@ def scan(ctx, timeout):
 @cli.command()
 @click.argument("name")
 @click.option(
-    "--protocol", "-p", type=click.Choice(["airplay", "companion"]), default="airplay"
+    "--protocol", "-p", type=_PROTOCOL, default="airplay"
 )
 @click.pass_context
-def connect(ctx, name, protocol):
+@_async_command
+async def connect(ctx, name, protocol):
     """Connect to a device by name (auto-detects AirPlay or Google Cast)."""
-    agent: CastAgent = ctx.obj["agent"]
-    proto = Protocol.AirPlay if protocol == "airplay" else Protocol.Companion
-    identifier, backend = asyncio.run(agent.connect_by_name(name, proto))
+    agent: CastAgent = _get_agent(ctx)
+    identifier, backend = await agent.connect_by_name(name, protocol)
     click.echo(f"Connected to {name} [{backend.device_type}] ({identifier})")
 
 
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def disconnect(ctx, identifier):
-    """Disconnect from a device."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.disconnect(identifier))
-    click.echo(f"Disconnected from {identifier}")
-
-
 @cli.command()
 @click.argument("name")
 @click.option(
-    "--protocol", "-p", type=click.Choice(["airplay", "companion"]), default="airplay"
+    "--protocol", "-p", type=_PROTOCOL, default="airplay"
 )
 @click.pass_context
-def pair(ctx, name, protocol):
+@_async_command
+async def pair(ctx, name, protocol):
     """Start pairing with a device (AirPlay only)."""
-    agent: CastAgent = ctx.obj["agent"]
-
-    async def do_pair():
-        devices = await agent.scan()
-        for dev in devices:
-            if dev["name"] == name:
-                proto = (
-                    Protocol.AirPlay if protocol == "airplay" else Protocol.Companion
-                )
-                result = await agent.pair(
-                    dev["identifier"], dev["address"], dev["name"], proto
-                )
-                return dev, result
-        return None, None
-
-    dev, result = asyncio.run(do_pair())
-    if not dev:
+    agent: CastAgent = _get_agent(ctx)
+    dev = await agent.find_device(name)
+    if dev is None:
         click.echo(f"Device '{name}' not found")
         return
 
+    result = await agent.pair(dev["identifier"], dev["address"], dev["name"], protocol)
+
     if result["status"] == "pin_required":
         click.echo(
             "PIN required on device - use pair-pin command with the code shown on your device"
@@ -96,29 +152,21 @@ def pair(ctx, name, protocol):
 
 @cli.command()
 @click.argument("name")
-@click.option("--pin", prompt="Enter PIN", hide_input=False, help="Pairing PIN code")
+@click.option("--pin", default=None, help="Pairing PIN code (prompted for if omitted)")
 @click.option(
-    "--protocol", "-p", type=click.Choice(["airplay", "companion"]), default="airplay"
+    "--protocol", "-p", type=_PROTOCOL, default="airplay"
 )
 @click.pass_context
-def pair_pin(ctx, name, pin, protocol):
+@_async_command
+async def pair_pin(ctx, name, pin, protocol):
     """Complete pairing with a PIN code (AirPlay only)."""
-    agent: CastAgent = ctx.obj["agent"]
-
-    async def do_pair_pin():
-        devices = await agent.scan()
-        for dev in devices:
-            if dev["name"] == name:
-                proto = (
-                    Protocol.AirPlay if protocol == "airplay" else Protocol.Companion
-                )
-                success = await agent.pair_with_pin(
-                    dev["identifier"], dev["address"], dev["name"], pin, proto
-                )
-                return success
-        return False
-
-    success = asyncio.run(do_pair_pin())
+    if pin is None:
+        pin = click.prompt("Enter PIN")
+    agent: CastAgent = _get_agent(ctx)
+    dev = await agent.find_device(name)
+    success = dev is not None and await agent.pair_with_pin(
+        dev["identifier"], dev["address"], dev["name"], pin, protocol
+    )
     if success:
         click.echo("Pairing successful! Credentials cached.")
     else:
@@ -130,79 +178,58 @@ def pair_pin(ctx, name, pin, protocol):
 @click.option(
     "--protocol",
     "-p",
-    type=click.Choice(["airplay", "companion", "all"]),
+    type=_ProtocolChoice(allow_all=True),
     default="all",
 )
 @click.pass_context
 def remove_credentials(ctx, identifier, protocol):
     """Remove cached credentials for a device."""
-    agent: CastAgent = ctx.obj["agent"]
-    if protocol == "all":
+    agent: CastAgent = _get_agent(ctx)
+    if protocol is None:
         agent.credentials.delete(identifier)
     else:
-        proto = Protocol.AirPlay if protocol == "airplay" else Protocol.Companion
-        agent.credentials.delete(identifier, proto.name)
+        agent.credentials.delete(identifier, protocol.name)
     click.echo(f"Credentials removed for {identifier}")
 
 
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def power_on(ctx, identifier):
-    """Turn on a device."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.power_on(identifier))
-    click.echo(f"Powered on {identifier}")
-
-
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def power_off(ctx, identifier):
-    """Turn off a device (quits app on Google Cast)."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.power_off(identifier))
-    click.echo(f"Powered off {identifier}")
-
-
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def power_state(ctx, identifier):
-    """Get power state of a device."""
-    agent: CastAgent = ctx.obj["agent"]
-    state = asyncio.run(agent.get_power_state(identifier))
-    click.echo(f"Power state: {'on' if state else 'off'}")
-
-
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def play(ctx, identifier):
-    """Start/resume playback."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.play(identifier))
-    click.echo("Playing")
-
-
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def pause(ctx, identifier):
-    """Pause playback."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.pause(identifier))
-    click.echo("Paused")
-
+def _add_identifier_command(name: str, method: str, doc: str, render):
+    """Register a command that calls ``agent.<method>(identifier)``.
+
+    ``render(identifier, result)`` builds the line echoed afterwards.
+    """
+    async def command(ctx, identifier):
+        agent: CastAgent = _get_agent(ctx)
+        result = await getattr(agent, method)(identifier)
+        click.echo(render(identifier, result))
+
+    command.__doc__ = doc
+    cli.command(name=name)(
+        click.argument("identifier")(click.pass_context(_async_command(command)))
+    )
+
+
+# (command name, agent method, help text, render(identifier, result))
+_IDENTIFIER_COMMANDS = (
+    ("disconnect", "disconnect", "Disconnect from a device.",
+     lambda identifier, _: f"Disconnected from {identifier}"),
+    ("power-on", "power_on", "Turn on a device.",
+     lambda identifier, _: f"Powered on {identifier}"),
+    ("power-off", "power_off", "Turn off a device (quits app on Google Cast).",
+     lambda identifier, _: f"Powered off {identifier}"),
+    ("power-state", "get_power_state", "Get power state of a device.",
+     lambda _, state: f"Power state: {'on' if state else 'off'}"),
+    ("play", "play", "Start/resume playback.", lambda *_: "Playing"),
+    ("pause", "pause", "Pause playback.", lambda *_: "Paused"),
+    ("stop", "stop", "Stop playback.", lambda *_: "Stopped"),
+    ("get-volume", "get_volume", "Get current volume.",
+     lambda _, volume: f"Volume: {volume}"),
+    ("now-playing", "now_playing", "Get now playing information.",
+     lambda _, info: serialization.dumps(info, indent=True).decode()),
+)
 
-@cli.command()
-@click.argument("identifier")
-@click.pass_context
-def stop(ctx, identifier):
-    """Stop playback."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.stop(identifier))
-    click.echo("Stopped")
+for _command in _IDENTIFIER_COMMANDS:
+    _add_identifier_command(*_command)
+del _command
 
 
 @cli.command()
@@ -210,13 +237,14 @@ def stop(ctx, identifier):
 @click.argument("url")
 @click.option("--position", "-p", default=0, help="Starting position in seconds")
 @click.pass_context
-def play_url(ctx, identifier, url, position):
+@_async_command
+async def play_url(ctx, identifier, url, position):
     """Play a URL."""
-    agent: CastAgent = ctx.obj["agent"]
+    agent: CastAgent = _get_agent(ctx)
     kwargs = {}
     if position > 0:
         kwargs["position"] = position
-    asyncio.run(agent.play_url(identifier, url, **kwargs))
+    await agent.play_url(identifier, url, **kwargs)
     click.echo(f"Playing {url}")
 
 
@@ -224,10 +252,11 @@ def play_url(ctx, identifier, url, position):
 @click.argument("identifier")
 @click.argument("file_path")
 @click.pass_context
-def stream_file(ctx, identifier, file_path):
+@_async_command
+async def stream_file(ctx, identifier, file_path):
     """Stream a local file."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.stream_file(identifier, file_path))
+    agent: CastAgent = _get_agent(ctx)
+    await agent.stream_file(identifier, file_path)
     click.echo(f"Streaming {file_path}")
 
 
@@ -236,10 +265,11 @@ def stream_file(ctx, identifier, file_path):
 @click.argument("image_path")
 @click.option("--duration", "-d", default=3600, type=int, help="Display duration in seconds (default: 3600)")
 @click.pass_context
-def display_image(ctx, identifier, image_path, duration):
+@_async_command
+async def display_image(ctx, identifier, image_path, duration):
     """Display a static image on a device (converts to video via ffmpeg)."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.display_image(identifier, image_path, duration))
+    agent: CastAgent = _get_agent(ctx)
+    await agent.display_image(identifier, image_path, duration)
     click.echo(f"Displaying {image_path} for {duration}s")
 
 
@@ -251,14 +281,14 @@ def display_image(ctx, identifier, image_path, duration):
     help="Piper voice model name (default: en_US-lessac-medium)",
 )
 @click.pass_context
-def announce(ctx, name, text, voice):
+@_async_command
+async def announce(ctx, name, text, voice):
     """Synthesise text to speech and play it on a device (by name)."""
     text = " ".join(text)
-    agent: CastAgent = ctx.obj["agent"]
+    agent: CastAgent = _get_agent(ctx)
 
     async def _run():
-        devices = await agent.scan(timeout=10)
-        dev = next((d for d in devices if d["name"] == name), None)
+        dev = await agent.find_device(name, timeout=10)
         if dev is None:
             raise ValueError(f"Device '{name}' not found")
         await agent.connect(dev["identifier"], dev["address"], dev["name"],
@@ -269,7 +299,7 @@ def announce(ctx, name, text, voice):
             await agent.disconnect(dev["identifier"])
 
     try:
-        asyncio.run(_run())
+        await _run()
     except (ValueError, FileNotFoundError) as e:
         raise click.ClickException(str(e))
     except RuntimeError as e:
@@ -281,10 +311,11 @@ def announce(ctx, name, text, voice):
 @click.argument("identifier")
 @click.argument("volume", type=float)
 @click.pass_context
-def set_volume(ctx, identifier, volume):
+@_async_command
+async def set_volume(ctx, identifier, volume):
     """Set volume (0.0 to 1.0)."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.set_volume(identifier, volume))
+    agent: CastAgent = _get_agent(ctx)
+    await agent.set_volume(identifier, volume)
     click.echo(f"Volume set to {volume}")
 
 
@@ -292,10 +323,11 @@ def set_volume(ctx, identifier, volume):
 @click.argument("identifier")
 @click.option("--delta", "-d", default=0.1, help="Volume delta")
 @click.pass_context
-def volume_up(ctx, identifier, delta):
+@_async_command
+async def volume_up(ctx, identifier, delta):
     """Increase volume."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.volume_up(identifier, delta))
+    agent: CastAgent = _get_agent(ctx)
+    await agent.volume_up(identifier, delta)
     click.echo(f"Volume up by {delta}")
 
 
@@ -303,64 +335,98 @@ def volume_up(ctx, identifier, delta):
 @click.argument("identifier")
 @click.option("--delta", "-d", default=0.1, help="Volume delta")
 @click.pass_context
-def volume_down(ctx, identifier, delta):
+@_async_command
+async def volume_down(ctx, identifier, delta):
     """Decrease volume."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.volume_down(identifier, delta))
+    agent: CastAgent = _get_agent(ctx)
+    await agent.volume_down(identifier, delta)
     click.echo(f"Volume down by {delta}")
 
 
 @cli.command()
 @click.argument("identifier")
+@click.argument("position", type=float)
 @click.pass_context
-def get_volume(ctx, identifier):
-    """Get current volume."""
-    agent: CastAgent = ctx.obj["agent"]
-    volume = asyncio.run(agent.get_volume(identifier))
-    click.echo(f"Volume: {volume}")
+@_async_command
+async def seek(ctx, identifier, position):
+    """Seek to position in seconds."""
+    agent: CastAgent = _get_agent(ctx)
+    await agent.seek(identifier, position)
+    click.echo(f"Seeked to {position}s")
 
 
 @cli.command()
 @click.argument("identifier")
+@click.argument("key", type=click.Choice(sorted(VALID_KEYS)))
 @click.pass_context
-def now_playing(ctx, identifier):
-    """Get now playing information."""
-    agent: CastAgent = ctx.obj["agent"]
-    info = asyncio.run(agent.now_playing(identifier))
-    click.echo(json.dumps(info, indent=2))
+@_async_command
+async def send_key(ctx, identifier, key):
+    """Send a key press (AirPlay only)."""
+    agent: CastAgent = _get_agent(ctx)
+    await agent.send_key(identifier, key)
+    click.echo(f"Sent key: {key}")
 
 
-@cli.command()
-@click.argument("identifier")
-@click.argument("position", type=float)
-@click.pass_context
-def seek(ctx, identifier, position):
-    """Seek to position in seconds."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.seek(identifier, position))
-    click.echo(f"Seeked to {position}s")
+def _run_shell_line(ctx: click.Context, args: list[str]):
+    """Invoke one shell line as a subcommand of ``ctx``, reporting errors inline."""
+    try:
+        name, command, rest = cli.resolve_command(ctx, args)
+        if command is shell:
+            raise click.UsageError("shell cannot be nested")
+        with command.make_context(name, rest, parent=ctx) as sub_ctx:
+            command.invoke(sub_ctx)
+    except click.exceptions.Exit:
+        pass  # e.g. after --help
+    except click.ClickException as e:
+        e.show()
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
 
 
 @cli.command()
-@click.argument("identifier")
-@click.argument("key")
 @click.pass_context
-def send_key(ctx, identifier, key):
-    """Send a key press (AirPlay only)."""
-    agent: CastAgent = ctx.obj["agent"]
-    asyncio.run(agent.send_key(identifier, key))
-    click.echo(f"Sent key: {key}")
+def shell(ctx):
+    """Run commands read from stdin, one per line, in a single session.
+
+    All lines share one agent and event loop, so connections, pairing
+    sessions and the Cast file server persist between commands. Blank
+    lines and # comments are ignored; "exit" or "quit" ends the session.
+    """
+    stdin = sys.stdin
+    interactive = stdin.isatty()
+    while True:
+        if interactive:
+            click.echo("castmasta> ", nl=False)
+        line = stdin.readline()
+        if not line:
+            break
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            continue
+        if not args:
+            continue
+        if args[0] in ("exit", "quit"):
+            break
+        _run_shell_line(ctx, args)
 
 
 @cli.command()
 @click.pass_context
 def tools(ctx):
     """Print LLM tool definitions (JSON)."""
-    agent: CastAgent = ctx.obj["agent"]
-    click.echo(json.dumps(agent.get_tool_definitions(), indent=2))
+    click.echo(get_tools_json())
 
 
 def main():
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # optional, see the "fast" extra
     cli(obj={})
 
 
@@ -10,6 +10,8 @@ class AgentConfig:
     default_credentials: Optional[dict] = None
     storage_path: Optional[str] = None
     cast_file_server_port: int = 8089
+    scan_cache_ttl: float = 10.0
+    media_cache_max_bytes: int = 256 * 1024 * 1024
 
 
 @dataclass
@@ -1,70 +1,192 @@
 """Credential storage for device pairing."""
 
+import asyncio
 import json
 import logging
 import os
-import tempfile
 from pathlib import Path
 from typing import Optional
 
+from . import serialization
+
 logger = logging.getLogger(__name__)
 
+# Delay before a dirty store is written to disk, so bursts of
+# set()/delete() calls (e.g. pairing several protocols) coalesce into one write.
+FLUSH_DELAY = 0.5
+
+_DEFAULT_STORAGE_PATH = Path(os.path.expanduser("~/.castmasta/credentials.json"))
+
 
 class CredentialStore:
-    """Store and retrieve device credentials."""
+    """Store and retrieve device credentials.
+
+    The file is read on first access rather than at construction, so callers
+    that never touch credentials don't pay for it. Parsed credentials are
+    cached per storage path for the lifetime of the process, so creating
+    several stores for the same file only reads it once.
+    """
+
+    _loaded: dict[Path, dict] = {}
+    # Background write in flight per storage path. Stores sharing a path
+    # share their data too, so their writes must not overlap or reorder.
+    _writes: dict[Path, asyncio.Future] = {}
 
     def __init__(self, storage_path: Optional[str] = None):
         if storage_path:
             self.storage_path = Path(storage_path)
         else:
-            self.storage_path = Path.home() / ".castmasta" / "credentials.json"
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
-        os.chmod(self.storage_path.parent, 0o700)
-        self._credentials: dict = self._load()
+            self.storage_path = _DEFAULT_STORAGE_PATH
+        self._dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Future] = None
+        self._credentials: Optional[dict] = None
+
+    @property
+    def _creds(self) -> dict:
+        if self._credentials is None:
+            cached = CredentialStore._loaded.get(self.storage_path)
+            if cached is None:
+                parent = self.storage_path.parent
+                parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+                if os.stat(parent).st_mode & 0o777 != 0o700:
+                    os.chmod(parent, 0o700)
+                cached = CredentialStore._loaded[self.storage_path] = self._load()
+            self._credentials = cached
+        return self._credentials
 
     def _load(self) -> dict:
-        if self.storage_path.exists():
-            try:
-                with open(self.storage_path) as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+        # A missing file raises FileNotFoundError (an IOError), so there is
+        # no separate exists() check racing the open.
+        try:
+            with open(self.storage_path, "rb") as f:
+                return self._migrate(serialization.loads(f.read()))
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    @staticmethod
+    def _migrate(data: dict) -> dict:
+        """Convert legacy flat ``"identifier:protocol"`` keys to nested dicts."""
+        nested: dict[str, dict[str, str]] = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                nested.setdefault(key, {}).update(value)
+            else:
+                # Identifiers are often MAC addresses, so split on the last colon.
+                identifier, _, protocol = key.rpartition(":")
+                nested.setdefault(identifier, {})[protocol] = value
+        return nested
 
     def _save(self):
-        dir_ = self.storage_path.parent
-        fd = None
-        tmp_path = None
+        self._write(self._creds)
+
+    def _write(self, credentials: dict):
+        # One fixed temp file per path; writers to a path never overlap (see _writes).
+        tmp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
+        data = serialization.dumps(credentials, indent=True)
         try:
-            fd = tempfile.mkstemp(dir=dir_, suffix=".tmp")
-            tmp_path = fd[1]
-            with os.fdopen(fd[0], "w") as f:
-                json.dump(self._credentials, f, indent=2)
-            os.chmod(tmp_path, 0o600)
+            # Mode is applied at creation, so no separate chmod is needed.
+            fd = os.open(
+                tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600,
+            )
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
             os.replace(tmp_path, self.storage_path)
         except OSError:
             logger.exception("Failed to save credentials")
-            if tmp_path and os.path.exists(tmp_path):
+            try:
                 os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
             raise
 
+    async def _save_async(self):
+        """Serialise and write on a worker thread so fsync doesn't stall the loop."""
+        # Snapshot on the loop thread; the worker must not see a dict mid-mutation.
+        snapshot = {ident: dict(protos) for ident, protos in self._creds.items()}
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError:
+            self._dirty = True  # retried by the next flush or aclose()
+
+    def _mark_dirty(self):
+        """Schedule a debounced write, or write immediately outside an event loop."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            self._save()
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(FLUSH_DELAY, self._flush)
+
+    def _in_flight_write(self) -> Optional[asyncio.Future]:
+        """Return the unfinished background write for this path on this loop."""
+        task = CredentialStore._writes.get(self.storage_path)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _flush(self):
+        self._flush_handle = None
+        if not self._dirty:
+            return
+        if self._in_flight_write() is not None:
+            # One writer per path at a time, from any store; try again later.
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                FLUSH_DELAY, self._flush,
+            )
+            return
+        self._dirty = False
+        task = self._flush_task = asyncio.ensure_future(self._save_async())
+        path = self.storage_path
+        CredentialStore._writes[path] = task
+
+        def _forget(done, path=path):
+            if CredentialStore._writes.get(path) is done:
+                del CredentialStore._writes[path]
+
+        task.add_done_callback(_forget)
+
+    async def aclose(self):
+        """Write any pending changes to disk."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        other = self._in_flight_write()
+        if other is not None:
+            await other  # another store's write to this path; don't race it
+        if self._dirty:
+            self._dirty = False
+            self._save()
+
     def get(self, identifier: str, protocol: str) -> Optional[str]:
-        key = f"{identifier}:{protocol}"
-        return self._credentials.get(key)
+        return self._creds.get(identifier, {}).get(protocol)
+
+    def get_all(self, identifier: str) -> dict[str, str]:
+        """Return a copy of every stored credential for ``identifier``, keyed by protocol."""
+        return dict(self._creds.get(identifier, ()))
 
     def set(self, identifier: str, protocol: str, credentials: str):
-        key = f"{identifier}:{protocol}"
-        self._credentials[key] = credentials
-        self._save()
+        self._creds.setdefault(identifier, {})[protocol] = credentials
+        self._mark_dirty()
 
     def delete(self, identifier: str, protocol: Optional[str] = None):
         if protocol:
-            key = f"{identifier}:{protocol}"
-            self._credentials.pop(key, None)
-        else:
-            keys_to_delete = [
-                k for k in self._credentials if k.startswith(f"{identifier}:")
-            ]
-            for key in keys_to_delete:
-                del self._credentials[key]
-        self._save()
+            protocols = self._creds.get(identifier)
+            if protocols is None or protocols.pop(protocol, None) is None:
+                return
+            if not protocols:
+                del self._creds[identifier]
+        elif self._creds.pop(identifier, None) is None:
+            return
+        self._mark_dirty()
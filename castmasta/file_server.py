@@ -1,12 +1,12 @@
 """HTTP file server for streaming local files to Google Cast devices."""
 
 import asyncio
-import functools
 import logging
 import mimetypes
-import os
+import secrets
 import socket
 from pathlib import Path
+from urllib.parse import quote, urlsplit
 
 from aiohttp import web
 
@@ -26,70 +26,104 @@ def _get_local_ip() -> str:
 
 
 class FileServer:
-    """Lightweight HTTP server that serves a single file for Cast devices."""
+    """Lightweight HTTP server that serves local files for Cast devices.
 
-    def __init__(self, port: int = 8089):
+    The server is started on the first serve_file() and then kept running.
+    Each served file gets its own unguessable URL, so several Cast devices
+    can share one server and port, and release() drops a single file.
+    ``port=0`` binds an ephemeral port, which ``port`` reports once started.
+    By default it listens on every interface and advertises the LAN address;
+    given a specific ``host`` it binds and advertises only that address.
+    """
+
+    def __init__(self, port: int = 8089, host: str = "0.0.0.0"):
         self._port = port
+        self._host = host
+        self._bound_port: int | None = None
         self._runner = None
-        self._file_path: str | None = None
-        self._file_name: str | None = None
+        self._local_ip: str | None = None
+        self._start_lock = asyncio.Lock()
+        # token -> (path, file name, content type)
+        self._files: dict[str, tuple[str, str, str]] = {}
+
+    @property
+    def port(self) -> int:
+        """The port being served on, or the configured port when stopped."""
+        return self._bound_port if self._bound_port is not None else self._port
+
+    async def serve_file(self, file_path: str, content_type: str | None = None) -> str:
+        """Start serving a file. Returns the URL to access it.
+
+        ``content_type`` is guessed from the file name when not given; either
+        way it is worked out once here, not on every request.
+        """
+        async with self._start_lock:
+            if self._runner is None:
+                await self._start()
+
+        token = secrets.token_urlsafe(8)
+        file_name = Path(file_path).name
+        if content_type is None:
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        self._files[token] = (file_path, file_name, content_type)
+        url = f"http://{self._local_ip}:{self.port}/media/{token}/{quote(file_name)}"
+        logger.info("File server serving %s", url)
+        return url
 
-    async def serve_file(self, file_path: str) -> str:
-        """Start serving a file. Returns the URL to access it."""
-        if self._runner is not None:
-            await self.shutdown()
-        self._file_path = file_path
-        self._file_name = Path(file_path).name
+    def served_paths(self) -> set[Path]:
+        """Return the paths of every file currently being served."""
+        return {Path(file_path) for file_path, _, _ in self._files.values()}
 
+    def release(self, url: str) -> None:
+        """Stop serving the file behind ``url``; the server keeps running."""
+        parts = urlsplit(url).path.split("/")
+        if len(parts) == 4 and parts[1] == "media":
+            self._files.pop(parts[2], None)
+
+    async def _start(self):
         app = web.Application()
-        app.router.add_get("/media/{filename}", self._handle_media)
+        app.router.add_get("/media/{token}/{filename}", self._handle_media)
         app.router.add_get("/{tail:.*}", self._handle_404)
 
-        self._runner = web.AppRunner(app)
-        await self._runner.setup()
-        site = web.TCPSite(self._runner, "0.0.0.0", self._port)
-        await site.start()
-
-        local_ip = _get_local_ip()
-        url = f"http://{local_ip}:{self._port}/media/{self._file_name}"
-        logger.info("File server started at %s", url)
-        return url
+        # Cast receivers issue many short Range requests; don't log each one.
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self._host, self._port)
+        try:
+            await site.start()
+        except BaseException:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        self._bound_port = runner.addresses[0][1]
+        if self._host != "0.0.0.0":
+            self._local_ip = self._host
+        else:
+            # Resolved once per server start (off the loop, it is a blocking
+            # connect()) rather than for every served file.
+            self._local_ip = await asyncio.to_thread(_get_local_ip)
+        logger.info("File server started on %s:%d", self._local_ip, self.port)
 
     async def _handle_media(self, request: web.Request) -> web.StreamResponse:
-        filename = request.match_info["filename"]
-        if filename != self._file_name or not self._file_path:
+        entry = self._files.get(request.match_info["token"])
+        if entry is None or entry[1] != request.match_info["filename"]:
             return web.Response(status=404)
+        file_path, _, content_type = entry
 
-        content_type = mimetypes.guess_type(self._file_path)[0] or "application/octet-stream"
-        file_size = os.path.getsize(self._file_path)
-
-        response = web.StreamResponse(
-            status=200,
-            headers={
-                "Content-Type": content_type,
-                "Content-Length": str(file_size),
-            },
-        )
-        await response.prepare(request)
-
-        loop = asyncio.get_running_loop()
-        with open(self._file_path, "rb") as f:
-            while True:
-                chunk = await loop.run_in_executor(None, functools.partial(f.read, 65536))
-                if not chunk:
-                    break
-                await response.write(chunk)
-
-        return response
+        # FileResponse uses sendfile() where the transport allows it, so the
+        # file is never copied through Python buffers, and it answers Range
+        # requests for seeking.
+        return web.FileResponse(file_path, headers={"Content-Type": content_type})
 
     async def _handle_404(self, request: web.Request) -> web.Response:
         return web.Response(status=404)
 
     async def shutdown(self):
-        """Stop the file server."""
+        """Stop the file server and forget every served file."""
+        self._files.clear()
         if self._runner:
             await self._runner.cleanup()
             self._runner = None
-            self._file_path = None
-            self._file_name = None
+            self._bound_port = None
+            self._local_ip = None
             logger.info("File server stopped")
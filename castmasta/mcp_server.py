@@ -1,49 +1,197 @@
 """MCP server for CastMasta."""
+import contextlib
+import functools
+import inspect
 import logging
-from typing import Optional
+import math
+import time
+from typing import TYPE_CHECKING, Optional
 
 import click
 
 from fastmcp import FastMCP
 
-from castmasta import CastAgent
-from pyatv.const import Protocol
+if TYPE_CHECKING:
+    from castmasta import CastAgent
+    from pyatv.const import Protocol
 
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("CastMasta")
+# The agent and pyatv are loaded on the first tool call, so importing the
+# module (e.g. for --help or to list tools) doesn't pay for them.
+_agent: Optional["CastAgent"] = None
 
-agent: CastAgent = CastAgent()
 
+def _get_agent() -> "CastAgent":
+    """Return the server's shared agent, creating it on first use."""
+    global _agent
+    if _agent is None:
+        from castmasta import CastAgent
 
-def _parse_protocol(protocol: str) -> Optional[Protocol]:
-    """Parse and validate protocol string. Returns None if invalid."""
-    if protocol == "airplay":
-        return Protocol.AirPlay
-    elif protocol == "companion":
-        return Protocol.Companion
-    return None
+        _agent = CastAgent()
+    return _agent
 
 
-@mcp.tool()
-async def scan_devices(timeout: int = 5) -> str:
+@contextlib.asynccontextmanager
+async def _lifespan(server):
+    """Close the agent, if a tool created one, when the server shuts down.
+
+    This flushes debounced credential writes and stops the file server,
+    device connections and pending pairing sessions.
+    """
+    try:
+        yield
+    finally:
+        if _agent is not None:
+            await _agent.aclose()
+
+
+mcp = FastMCP("CastMasta", lifespan=_lifespan)
+
+
+# Tool protocol name -> pyatv Protocol member name.
+_PROTO_MEMBERS = {"airplay": "AirPlay", "companion": "Companion"}
+
+
+def _parse_protocol(name: str) -> Optional["Protocol"]:
+    """Return the ``Protocol`` for a tool's protocol name, or None if unknown."""
+    member = _PROTO_MEMBERS.get(name)
+    if member is None:
+        return None
+    from pyatv.const import Protocol
+
+    return Protocol[member]
+
+
+# (label, now_playing key) for the text lines of the now_playing tool.
+_NOW_PLAYING_LINES = (
+    ("Title", "title"),
+    ("Artist", "artist"),
+    ("Album", "album"),
+    ("State", "device_state"),
+)
+
+
+# Consecutive unexpected failures after which a device's tools fail fast,
+# and how long (seconds) they do so before a call is let through again.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+
+
+class _CircuitBreaker:
+    """Per-device count of consecutive unexpected tool failures.
+
+    After ``threshold`` failures in a row the device is refused for
+    ``cooldown`` seconds. The first call after that is let through and
+    either closes the breaker (success) or reopens it (failure).
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+
+    def retry_after(self, identifier: str) -> float:
+        """Return seconds until ``identifier`` may be called again, 0 if now."""
+        until = self._open_until.get(identifier)
+        if until is None:
+            return 0
+        return max(0, until - time.monotonic())
+
+    def record_success(self, identifier: str):
+        self._failures.pop(identifier, None)
+        self._open_until.pop(identifier, None)
+
+    def record_failure(self, identifier: str):
+        count = self._failures.get(identifier, 0) + 1
+        self._failures[identifier] = count
+        if count >= self.threshold:
+            self._open_until[identifier] = time.monotonic() + self.cooldown
+
+
+_breaker = _CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+
+# Tool coroutines in definition order, registered with FastMCP in one pass
+# at the end of the module.
+_TOOL_FUNCTIONS: list = []
+
+
+def _register(fn):
+    _TOOL_FUNCTIONS.append(fn)
+    return fn
+
+
+def _tool(failure: str, *expected: tuple, breaker: bool = True):
+    """Mark a coroutine as an MCP tool with shared error handling.
+
+    ``expected`` holds ``(exception types, message)`` pairs; a matching error
+    is returned as its message. Anything else is logged and reported as
+    ``failure``. Both templates are formatted with the tool's arguments, and
+    messages may also use ``{e}`` for the exception.
+
+    Unless ``breaker`` is false, tools taking an ``identifier`` fail fast
+    while that device's circuit breaker is open. Only ``failure`` errors
+    count towards opening it; a ``ValueError`` (bad input, or a device that
+    isn't connected) never does.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        guarded = breaker and "identifier" in signature.parameters
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            identifier = bound.arguments.get("identifier") if guarded else None
+            if identifier is not None:
+                wait = _breaker.retry_after(identifier)
+                if wait:
+                    return f"Device {identifier} marked unreachable; try again in {math.ceil(wait)}s"
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                bound.apply_defaults()
+                for exc_types, message in expected:
+                    if isinstance(e, exc_types):
+                        return message.format(e=e, **bound.arguments)
+                if identifier is not None and not isinstance(e, ValueError):
+                    _breaker.record_failure(identifier)
+                failure_message = failure.format(**bound.arguments)
+                logger.exception(failure_message)
+                return failure_message
+            if identifier is not None:
+                _breaker.record_success(identifier)
+            return result
+
+        return _register(wrapper)
+
+    return decorator
+
+
+@_register
+async def scan_devices(timeout: int = 5, refresh: bool = False) -> str:
     """Scan the local network for AirPlay and Google Cast devices.
 
     Returns a list of all discovered devices with their names, addresses, and supported protocols.
+
+    Args:
+        timeout: Scan timeout in seconds (default: 5)
+        refresh: Scan again even if a recent result is cached (default: false)
     """
-    devices = await agent.scan(timeout)
+    devices = await _get_agent().scan(timeout, refresh=refresh)
     if not devices:
         return "No devices found on the network."
 
-    result = ["Found devices:\n"]
-    for dev in devices:
-        result.append(f"- {dev['name']} ({dev['address']}) [{dev['device_type']}]")
-        result.append(f"  Identifier: {dev['identifier']}")
-        result.append(f"  Protocols: {', '.join(dev['protocols'])}")
-    return "\n".join(result)
+    return "Found devices:\n\n" + "\n".join(
+        f"- {dev['name']} ({dev['address']}) [{dev['device_type']}]\n"
+        f"  Identifier: {dev['identifier']}\n"
+        f"  Protocols: {', '.join(dev['protocols'])}"
+        for dev in devices
+    )
 
 
-@mcp.tool()
+@_tool("Failed to connect to {name}: device unreachable or pairing required")
 async def connect_device(name: str, protocol: str = "airplay", host: Optional[str] = None) -> str:
     """Connect to a device by name (auto-detects AirPlay or Google Cast).
 
@@ -55,121 +203,91 @@ async def connect_device(name: str, protocol: str = "airplay", host: Optional[st
     proto = _parse_protocol(protocol)
     if proto is None:
         return f"Invalid protocol '{protocol}'. Must be 'airplay' or 'companion'."
-    try:
-        hosts = [host] if host else None
-        identifier, backend = await agent.connect_by_name(name, proto, hosts=hosts)
-        return f"Connected to {name} [{backend.device_type}] identifier={identifier}"
-    except Exception:
-        logger.exception("Failed to connect to device")
-        return f"Failed to connect to {name}: device unreachable or pairing required"
+    hosts = [host] if host else None
+    identifier, backend = await _get_agent().connect_by_name(name, proto, hosts=hosts)
+    _breaker.record_success(identifier)  # a fresh connection starts with a closed breaker
+    return f"Connected to {name} [{backend.device_type}] identifier={identifier}"
 
 
-@mcp.tool()
+@_tool("Failed to disconnect from {identifier}", breaker=False)
 async def disconnect_device(identifier: str) -> str:
     """Disconnect from a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.disconnect(identifier)
-        return f"Disconnected from {identifier}"
-    except Exception:
-        logger.exception("Failed to disconnect")
-        return f"Failed to disconnect from {identifier}"
+    await _get_agent().disconnect(identifier)
+    _breaker.record_success(identifier)
+    return f"Disconnected from {identifier}"
 
 
-@mcp.tool()
+@_tool("Failed to power on {identifier}")
 async def power_on(identifier: str) -> str:
     """Turn on a device (AirPlay only; no-op on Google Cast).
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.power_on(identifier)
-        return f"Powered on {identifier}"
-    except Exception:
-        logger.exception("Failed to power on device")
-        return f"Failed to power on {identifier}"
+    await _get_agent().power_on(identifier)
+    return f"Powered on {identifier}"
 
 
-@mcp.tool()
+@_tool("Failed to power off {identifier}")
 async def power_off(identifier: str) -> str:
     """Turn off a device (quits app on Google Cast).
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.power_off(identifier)
-        return f"Powered off {identifier}"
-    except Exception:
-        logger.exception("Failed to power off device")
-        return f"Failed to power off {identifier}"
+    await _get_agent().power_off(identifier)
+    return f"Powered off {identifier}"
 
 
-@mcp.tool()
+@_tool("Failed to get power state for {identifier}")
 async def get_power_state(identifier: str) -> str:
     """Get the power state of a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        state = await agent.get_power_state(identifier)
-        return f"Power state: {'on' if state else 'off'}"
-    except Exception:
-        logger.exception("Failed to get power state")
-        return f"Failed to get power state for {identifier}"
+    state = await _get_agent().get_power_state(identifier)
+    return f"Power state: {'on' if state else 'off'}"
 
 
-@mcp.tool()
+@_tool("Failed to start playback")
 async def play(identifier: str) -> str:
     """Start or resume playback on a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.play(identifier)
-        return "Playing"
-    except Exception:
-        logger.exception("Failed to play")
-        return "Failed to start playback"
+    await _get_agent().play(identifier)
+    return "Playing"
 
 
-@mcp.tool()
+@_tool("Failed to pause playback")
 async def pause(identifier: str) -> str:
     """Pause playback on a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.pause(identifier)
-        return "Paused"
-    except Exception:
-        logger.exception("Failed to pause")
-        return "Failed to pause playback"
+    await _get_agent().pause(identifier)
+    return "Paused"
 
 
-@mcp.tool()
+@_tool("Failed to stop playback")
 async def stop(identifier: str) -> str:
     """Stop playback on a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        await agent.stop(identifier)
-        return "Stopped"
-    except Exception:
-        logger.exception("Failed to stop")
-        return "Failed to stop playback"
+    await _get_agent().stop(identifier)
+    return "Stopped"
 
 
-@mcp.tool()
+@_tool("Failed to play URL on {identifier}", (ValueError, "Invalid URL: {e}"))
 async def play_url(identifier: str, url: str, position: float = 0) -> str:
     """Play a video or audio URL on a device.
 
@@ -178,20 +296,17 @@ async def play_url(identifier: str, url: str, position: float = 0) -> str:
         url: The URL to play (must be HTTP or HTTPS)
         position: Optional starting position in seconds
     """
-    try:
-        kwargs = {}
-        if position > 0:
-            kwargs["position"] = position
-        await agent.play_url(identifier, url, **kwargs)
-        return f"Playing URL on {identifier}"
-    except ValueError as e:
-        return f"Invalid URL: {e}"
-    except Exception:
-        logger.exception("Failed to play URL")
-        return f"Failed to play URL on {identifier}"
-
-
-@mcp.tool()
+    kwargs = {}
+    if position > 0:
+        kwargs["position"] = position
+    await _get_agent().play_url(identifier, url, **kwargs)
+    return f"Playing URL on {identifier}"
+
+
+@_tool(
+    "Failed to stream file on {identifier}",
+    ((ValueError, FileNotFoundError), "Invalid file: {e}"),
+)
 async def stream_file(identifier: str, file_path: str) -> str:
     """Stream a local audio/video file to a device.
 
@@ -199,17 +314,15 @@ async def stream_file(identifier: str, file_path: str) -> str:
         identifier: The device identifier
         file_path: Path to local media file (MP3, WAV, FLAC, OGG, MP4, M4A, AAC)
     """
-    try:
-        await agent.stream_file(identifier, file_path)
-        return f"Streaming file on {identifier}"
-    except (ValueError, FileNotFoundError) as e:
-        return f"Invalid file: {e}"
-    except Exception:
-        logger.exception("Failed to stream file")
-        return f"Failed to stream file on {identifier}"
+    await _get_agent().stream_file(identifier, file_path)
+    return f"Streaming file on {identifier}"
 
 
-@mcp.tool()
+@_tool(
+    "Failed to display image on {identifier}",
+    ((ValueError, FileNotFoundError), "Invalid image: {e}"),
+    (RuntimeError, "ffmpeg error: {e}"),
+)
 async def display_image(identifier: str, image_path: str, duration: int = 3600) -> str:
     """Display a static image on a device.
 
@@ -220,19 +333,15 @@ async def display_image(identifier: str, image_path: str, duration: int = 3600)
         image_path: Path to image file (PNG, JPG, JPEG, BMP, GIF, WEBP)
         duration: How long to display in seconds (default: 3600, max: 86400)
     """
-    try:
-        await agent.display_image(identifier, image_path, duration)
-        return f"Displaying image on {identifier} for {duration}s"
-    except (ValueError, FileNotFoundError) as e:
-        return f"Invalid image: {e}"
-    except RuntimeError as e:
-        return f"ffmpeg error: {e}"
-    except Exception:
-        logger.exception("Failed to display image")
-        return f"Failed to display image on {identifier}"
-
-
-@mcp.tool()
+    await _get_agent().display_image(identifier, image_path, duration)
+    return f"Displaying image on {identifier} for {duration}s"
+
+
+@_tool(
+    "Failed to announce on {identifier}",
+    ((ValueError, FileNotFoundError), "Invalid input: {e}"),
+    (RuntimeError, "Piper TTS error: {e}"),
+)
 async def announce(identifier: str, text: str, voice: str = "en_US-lessac-medium") -> str:
     """Synthesise text to speech and play it on a device.
 
@@ -244,19 +353,11 @@ async def announce(identifier: str, text: str, voice: str = "en_US-lessac-medium
         text: Text to speak (max 4000 characters)
         voice: Piper voice model name (default: en_US-lessac-medium)
     """
-    try:
-        await agent.announce(identifier, text, voice)
-        return f"Announced on {identifier}: {text[:60]}{'...' if len(text) > 60 else ''}"
-    except (ValueError, FileNotFoundError) as e:
-        return f"Invalid input: {e}"
-    except RuntimeError as e:
-        return f"Piper TTS error: {e}"
-    except Exception:
-        logger.exception("Failed to announce")
-        return f"Failed to announce on {identifier}"
-
-
-@mcp.tool()
+    await _get_agent().announce(identifier, text, voice)
+    return f"Announced on {identifier}: {text[:60]}{'...' if len(text) > 60 else ''}"
+
+
+@_tool("Failed to set volume on {identifier}", (ValueError, "{e}"))
 async def set_volume(identifier: str, volume: float) -> str:
     """Set the volume on a device.
 
@@ -264,17 +365,11 @@ async def set_volume(identifier: str, volume: float) -> str:
         identifier: The device identifier
         volume: Volume level from 0.0 (mute) to 1.0 (max)
     """
-    try:
-        await agent.set_volume(identifier, volume)
-        return f"Volume set to {volume}"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to set volume")
-        return f"Failed to set volume on {identifier}"
+    await _get_agent().set_volume(identifier, volume)
+    return f"Volume set to {volume}"
 
 
-@mcp.tool()
+@_tool("Failed to increase volume on {identifier}", (ValueError, "{e}"))
 async def volume_up(identifier: str, delta: float = 0.1) -> str:
     """Increase the volume on a device.
 
@@ -282,17 +377,11 @@ async def volume_up(identifier: str, delta: float = 0.1) -> str:
         identifier: The device identifier
         delta: Amount to increase (0.0 to 1.0, default: 0.1)
     """
-    try:
-        await agent.volume_up(identifier, delta)
-        return f"Volume up by {delta}"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to increase volume")
-        return f"Failed to increase volume on {identifier}"
+    await _get_agent().volume_up(identifier, delta)
+    return f"Volume up by {delta}"
 
 
-@mcp.tool()
+@_tool("Failed to decrease volume on {identifier}", (ValueError, "{e}"))
 async def volume_down(identifier: str, delta: float = 0.1) -> str:
     """Decrease the volume on a device.
 
@@ -300,53 +389,35 @@ async def volume_down(identifier: str, delta: float = 0.1) -> str:
         identifier: The device identifier
         delta: Amount to decrease (0.0 to 1.0, default: 0.1)
     """
-    try:
-        await agent.volume_down(identifier, delta)
-        return f"Volume down by {delta}"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to decrease volume")
-        return f"Failed to decrease volume on {identifier}"
+    await _get_agent().volume_down(identifier, delta)
+    return f"Volume down by {delta}"
 
 
-@mcp.tool()
+@_tool("Failed to get volume for {identifier}")
 async def get_volume(identifier: str) -> str:
     """Get the current volume level of a device.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        volume = await agent.get_volume(identifier)
-        return f"Volume: {volume}"
-    except Exception:
-        logger.exception("Failed to get volume")
-        return f"Failed to get volume for {identifier}"
+    volume = await _get_agent().get_volume(identifier)
+    return f"Volume: {volume}"
 
 
-@mcp.tool()
+@_tool("Failed to get now playing info for {identifier}")
 async def now_playing(identifier: str) -> str:
     """Get information about currently playing media.
 
     Args:
         identifier: The device identifier
     """
-    try:
-        info = await agent.now_playing(identifier)
-        return (
-            f"Title: {info.get('title', 'Unknown')}\n"
-            f"Artist: {info.get('artist', 'Unknown')}\n"
-            f"Album: {info.get('album', 'Unknown')}\n"
-            f"State: {info.get('device_state', 'Unknown')}\n"
-            f"Position: {info.get('position', 0)}s / {info.get('total_time', 0)}s"
-        )
-    except Exception:
-        logger.exception("Failed to get now playing info")
-        return f"Failed to get now playing info for {identifier}"
-
-
-@mcp.tool()
+    info = await _get_agent().now_playing(identifier)
+    lines = [f"{label}: {info.get(key, 'Unknown')}" for label, key in _NOW_PLAYING_LINES]
+    lines.append(f"Position: {info.get('position', 0)}s / {info.get('total_time', 0)}s")
+    return "\n".join(lines)
+
+
+@_tool("Failed to seek on {identifier}")
 async def seek(identifier: str, position: float) -> str:
     """Seek to a specific position in the current media.
 
@@ -354,15 +425,11 @@ async def seek(identifier: str, position: float) -> str:
         identifier: The device identifier
         position: Position in seconds
     """
-    try:
-        await agent.seek(identifier, position)
-        return f"Seeked to {position}s"
-    except Exception:
-        logger.exception("Failed to seek")
-        return f"Failed to seek on {identifier}"
+    await _get_agent().seek(identifier, position)
+    return f"Seeked to {position}s"
 
 
-@mcp.tool()
+@_tool("Failed to send key on {identifier}", (ValueError, "{e}"))
 async def send_key(identifier: str, key: str) -> str:
     """Send a remote control key press (AirPlay only).
 
@@ -370,17 +437,11 @@ async def send_key(identifier: str, key: str) -> str:
         identifier: The device identifier
         key: Key name - up, down, left, right, select, menu, home, play, pause, play_pause, next, previous
     """
-    try:
-        await agent.send_key(identifier, key)
-        return f"Sent key: {key}"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to send key")
-        return f"Failed to send key on {identifier}"
+    await _get_agent().send_key(identifier, key)
+    return f"Sent key: {key}"
 
 
-@mcp.tool()
+@_tool("Failed to pair with {name}", (ValueError, "{e}"))
 async def pair_device(name: str, protocol: str = "airplay", host: Optional[str] = None) -> str:
     """Start pairing with a device (AirPlay only).
 
@@ -392,22 +453,15 @@ async def pair_device(name: str, protocol: str = "airplay", host: Optional[str]
     proto = _parse_protocol(protocol)
     if proto is None:
         return f"Invalid protocol '{protocol}'. Must be 'airplay' or 'companion'."
-    try:
-        hosts = [host] if host else None
-        devices = await agent.scan(hosts=hosts)
-        for dev in devices:
-            if dev["name"] == name:
-                result = await agent.pair(dev["identifier"], dev["address"], dev["name"], proto)
-                return f"Pairing initiated for {name}. Status: {result['status']}. Use pair_device_with_pin to complete."
+    hosts = [host] if host else None
+    dev = await _get_agent().find_device(name, hosts=hosts)
+    if dev is None:
         return f"Device '{name}' not found"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to start pairing")
-        return f"Failed to pair with {name}"
+    result = await _get_agent().pair(dev["identifier"], dev["address"], dev["name"], proto)
+    return f"Pairing initiated for {name}. Status: {result['status']}. Use pair_device_with_pin to complete."
 
 
-@mcp.tool()
+@_tool("Failed to complete pairing with {name}", (ValueError, "{e}"))
 async def pair_device_with_pin(name: str, pin: str, protocol: str = "airplay", host: Optional[str] = None) -> str:
     """Complete pairing with a PIN code (AirPlay only).
 
@@ -420,21 +474,68 @@ async def pair_device_with_pin(name: str, pin: str, protocol: str = "airplay", h
     proto = _parse_protocol(protocol)
     if proto is None:
         return f"Invalid protocol '{protocol}'. Must be 'airplay' or 'companion'."
-    try:
-        hosts = [host] if host else None
-        devices = await agent.scan(hosts=hosts)
-        for dev in devices:
-            if dev["name"] == name:
-                success = await agent.pair_with_pin(dev["identifier"], dev["address"], dev["name"], pin, proto)
-                if success:
-                    return "Pairing successful! Credentials cached."
-                return "Pairing failed. Please try again."
+    hosts = [host] if host else None
+    dev = await _get_agent().find_device(name, hosts=hosts)
+    if dev is None:
         return f"Device '{name}' not found"
-    except ValueError as e:
-        return str(e)
-    except Exception:
-        logger.exception("Failed to complete pairing")
-        return f"Failed to complete pairing with {name}"
+    success = await _get_agent().pair_with_pin(dev["identifier"], dev["address"], dev["name"], pin, proto)
+    if success:
+        return "Pairing successful! Credentials cached."
+    return "Pairing failed. Please try again."
+
+
+@_register
+async def batch(ops: list[dict]) -> list[str]:
+    """Run several tools in order within a single call.
+
+    Each step runs after the previous one finishes, so a step can rely on an
+    earlier one (e.g. connect_device, then set_volume). A failing step is
+    reported in its result and the remaining steps still run.
+
+    Args:
+        ops: Steps to run, each {"tool": "<tool name>", "args": {<tool arguments>}}
+    """
+    results = []
+    for op in ops:
+        if not isinstance(op, dict):
+            results.append('Invalid step: expected {"tool": ..., "args": {...}}')
+            continue
+        name = op.get("tool")
+        entry = _TOOL_TABLE.get(name) if isinstance(name, str) else None
+        if entry is None:
+            results.append(f"Unknown tool '{name}'")
+            continue
+        fn, signature = entry
+        args = op.get("args")
+        if args is None:
+            args = {}
+        if not isinstance(args, dict):
+            results.append(f"Invalid arguments for {name}: args must be an object")
+            continue
+        # Bound separately from the call, so a TypeError raised inside the
+        # tool isn't mistaken for bad arguments.
+        try:
+            bound = signature.bind(**args)
+        except TypeError as e:
+            results.append(f"Invalid arguments for {name}: {e}")
+            continue
+        try:
+            results.append(await fn(*bound.args, **bound.kwargs))
+        except Exception as e:
+            logger.exception("Batch step %s failed", name)
+            results.append(f"{name} failed: {e}")
+    return results
+
+
+# Tools batch() can dispatch to, with their signatures; batch itself is left
+# out so calls can't nest.
+_TOOL_TABLE = {
+    fn.__name__: (fn, inspect.signature(fn)) for fn in _TOOL_FUNCTIONS if fn is not batch
+}
+
+for _fn in _TOOL_FUNCTIONS:
+    mcp.tool()(_fn)
+del _fn
 
 
 @click.command()
@@ -443,6 +544,11 @@ async def pair_device_with_pin(name: str, pin: str, protocol: str = "airplay", h
 @click.option("--stdio", "transport", flag_value="stdio", default=True, help="Use stdio transport (default)")
 @click.option("--http", "transport", flag_value="http", help="Use HTTP transport")
 def main(host, port, transport):
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # optional, see the "fast" extra
     if transport == "http":
         mcp.run(transport="http", host=host, port=port)
     else:
@@ -0,0 +1,114 @@
+"""On-disk cache for media rendered by announce() and display_image()."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# In-progress renders use this prefix so eviction never touches them.
+_TMP_PREFIX = ".render-"
+
+
+class MediaCache:
+    """Content-addressed store of rendered media files.
+
+    Files are named by the SHA-256 of their inputs, so repeating an
+    announcement or image reuses the earlier piper/ffmpeg output. Once the
+    cache grows past ``max_bytes`` the least recently used files are removed.
+    ``in_use``, if given, returns paths that are still being read (e.g.
+    served to a Cast device); eviction skips them.
+    """
+
+    def __init__(
+        self, root: Path, max_bytes: int,
+        in_use: Optional[Callable[[], Iterable[Path]]] = None,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._in_use = in_use
+        # path -> [lock, number of tasks holding or waiting for it]
+        self._locks: dict[Path, list] = {}
+
+    @staticmethod
+    def key(*parts: bytes) -> str:
+        """Hash ``parts`` into a cache key; parts are length-prefixed so they can't run together."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    async def get_or_render(
+        self, kind: str, key: str, suffix: str,
+        render: Callable[[str], Awaitable[None]],
+    ) -> Path:
+        """Return the cached file for ``key``, calling ``render(tmp_path)`` on a miss.
+
+        Concurrent requests for the same key wait for a single render.
+        """
+        path = self.root / kind / f"{key}{suffix}"
+        entry = self._locks.get(path)
+        if entry is None:
+            entry = self._locks[path] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                try:
+                    os.utime(path)  # mark as recently used for eviction
+                    return path
+                except FileNotFoundError:
+                    pass
+                path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+                # mkstemp creates the file with mode 0o600.
+                fd, tmp_path = tempfile.mkstemp(suffix=suffix, prefix=_TMP_PREFIX, dir=path.parent)
+                os.close(fd)
+                try:
+                    await render(tmp_path)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    try:
+                        os.unlink(tmp_path)
+                    except FileNotFoundError:
+                        pass
+                    raise
+        finally:
+            # Dropped only once no task holds or waits for it, so a late
+            # caller can't get a fresh lock and render the same key again.
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[path]
+        # Collected on the loop, as the in-use set may change under a worker thread.
+        keep = {path, *self._in_use()} if self._in_use else {path}
+        await asyncio.to_thread(self._evict, keep)
+        return path
+
+    def _evict(self, keep: set[Path]):
+        entries = []
+        total = 0
+        for entry in self.root.glob("*/*"):
+            if entry.name.startswith(_TMP_PREFIX):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, entry in sorted(entries):
+            if entry in keep:
+                continue
+            try:
+                entry.unlink()
+            except OSError:
+                logger.warning("Failed to evict cached media %s", entry)
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,23 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialise *obj* to UTF-8 JSON bytes, optionally indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON. Raises json.JSONDecodeError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
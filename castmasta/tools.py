@@ -1,5 +1,16 @@
 """Tool definitions for LLM function calling."""
 
+import functools
+
+from . import serialization
+
+# Key names accepted by send_key; each matches a pyatv RemoteControl method.
+_KEY_NAMES = (
+    "up", "down", "left", "right", "select", "menu", "home",
+    "play", "pause", "play_pause", "next", "previous",
+)
+VALID_KEYS = frozenset(_KEY_NAMES)
+
 TOOLS = [
     {
         "name": "scan_devices",
@@ -11,7 +22,12 @@ TOOLS = [
                     "type": "number",
                     "description": "Scan timeout in seconds (default: 5)",
                     "default": 5.0,
-                }
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Scan again even if a recent result is cached (default: false)",
+                    "default": False,
+                },
             },
         },
     },
@@ -267,7 +283,7 @@ TOOLS = [
                 "identifier": {"type": "string", "description": "Device identifier"},
                 "key": {
                     "type": "string",
-                    "description": "Key name: up, down, left, right, select, menu, home, play, pause, play_pause, next, previous",
+                    "description": f"Key name: {', '.join(_KEY_NAMES)}",
                 },
             },
             "required": ["identifier", "key"],
@@ -306,6 +322,31 @@ TOOLS = [
             "required": ["name", "pin"],
         },
     },
+    {
+        "name": "batch",
+        "description": (
+            "Run several of the other tools in order in one call; returns one result per step. "
+            "A failing step is reported in its result and the remaining steps still run."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "ops": {
+                    "type": "array",
+                    "description": "Steps to run, in order",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "tool": {"type": "string", "description": "Name of the tool to run (not batch)"},
+                            "args": {"type": "object", "description": "Arguments for the tool"},
+                        },
+                        "required": ["tool"],
+                    },
+                },
+            },
+            "required": ["ops"],
+        },
+    },
 ]
 
 
@@ -314,6 +355,15 @@ def get_tool_definitions() -> list[dict]:
     return TOOLS
 
 
+_TOOL_NAMES = tuple(tool["name"] for tool in TOOLS)
+
+
 def get_tool_names() -> list[str]:
     """Return the list of tool names."""
-    return [tool["name"] for tool in TOOLS]
+    return list(_TOOL_NAMES)
+
+
+@functools.cache
+def get_tools_json() -> str:
+    """Return the tool definitions as indented JSON, serialised once."""
+    return serialization.dumps(TOOLS, indent=True).decode()
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -30,7 +31,7 @@ def mock_cast_backend():
 @pytest.mark.asyncio
 async def test_scan_merges_airplay_and_cast(agent):
     with patch("castmasta.agent.pyatv") as mock_pyatv, \
-         patch("castmasta.agent.pychromecast") as mock_pcc:
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock) as mock_browse:
         atv = MagicMock()
         atv.name = "Apple TV"
         atv.address = "192.168.1.10"
@@ -38,13 +39,11 @@ async def test_scan_merges_airplay_and_cast(agent):
         atv.services = []
         mock_pyatv.scan = AsyncMock(return_value=[atv])
 
-        cc = MagicMock()
-        cc.name = "Chromecast"
-        cc.host = "192.168.1.20"
-        cc.uuid = "cast-uuid-1"
-        cc.cast_type = "cast"
-        browser = MagicMock()
-        mock_pcc.get_chromecasts.return_value = ([cc], browser)
+        info = MagicMock()
+        info.friendly_name = "Chromecast"
+        info.host = "192.168.1.20"
+        info.uuid = "cast-uuid-1"
+        mock_browse.return_value = [info]
 
         devices = await agent.scan()
         assert len(devices) == 2
@@ -52,6 +51,260 @@ async def test_scan_merges_airplay_and_cast(agent):
         assert types == {"airplay", "googlecast"}
 
 
+@pytest.mark.asyncio
+async def test_scan_abandons_hung_backend(agent, monkeypatch):
+    monkeypatch.setattr("castmasta.agent.SCAN_GRACE_PERIOD", 0)
+
+    async def hang(timeout):
+        await asyncio.sleep(60)
+
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", side_effect=hang):
+        atv = MagicMock()
+        atv.name = "Apple TV"
+        atv.address = "192.168.1.10"
+        atv.identifier = "airplay-id-1"
+        atv.services = []
+        mock_pyatv.scan = AsyncMock(return_value=[atv])
+
+        devices = await asyncio.wait_for(agent.scan(timeout=1), 5)
+
+    assert [d["name"] for d in devices] == ["Apple TV"]
+
+
+def _install_fake_cast_browser(monkeypatch, announcements):
+    """Patch CastBrowser with a fake that announces ``(delay, name)`` pairs from a thread."""
+    import threading
+    import time
+    import castmasta.agent as agent_mod
+
+    class FakeBrowser:
+        def __init__(self, listener, zconf):
+            self.listener = listener
+            self.devices = {}
+            self.stopped = False
+
+        def start_discovery(self):
+            def announce():
+                for n, (delay, name) in enumerate(announcements):
+                    time.sleep(delay)
+                    self.devices[f"uuid-{n}"] = MagicMock(friendly_name=name)
+                    self.listener.add_cast(f"uuid-{n}", "service")
+            threading.Thread(target=announce).start()
+
+        def stop_discovery(self):
+            self.stopped = True
+
+    browsers = []
+    monkeypatch.setattr(agent_mod, "CAST_QUIET_PERIOD", 0.05)
+    monkeypatch.setattr(
+        agent_mod.pychromecast.discovery, "CastBrowser",
+        lambda *args: browsers.append(FakeBrowser(*args)) or browsers[-1],
+    )
+    return browsers
+
+
+@pytest.mark.asyncio
+async def test_targeted_browse_stops_after_quiet_period(agent, monkeypatch):
+    browsers = _install_fake_cast_browser(monkeypatch, [(0, "Kitchen")])
+    with patch("castmasta.agent.zeroconf"):
+        infos = await asyncio.wait_for(
+            agent._browse_cast(timeout=5, stop_when=lambda info: info.friendly_name == "Office"), 2,
+        )
+
+    assert [i.friendly_name for i in infos] == ["Kitchen"]
+    assert browsers[0].stopped
+
+
+@pytest.mark.asyncio
+async def test_full_browse_keeps_late_devices(agent, monkeypatch):
+    browsers = _install_fake_cast_browser(monkeypatch, [(0, "Kitchen"), (0.2, "Office")])
+    with patch("castmasta.agent.zeroconf"):
+        infos = await asyncio.wait_for(agent._browse_cast(timeout=0.5), 2)
+
+    assert [i.friendly_name for i in infos] == ["Kitchen", "Office"]
+    assert browsers[0].stopped
+
+
+@pytest.mark.asyncio
+async def test_scan_reuses_fresh_results(agent):
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock, return_value=[]):
+        mock_pyatv.scan = AsyncMock(return_value=[])
+
+        await agent.scan()
+        await agent.scan()
+        assert mock_pyatv.scan.call_count == 1
+
+        await agent.scan(refresh=True)
+        assert mock_pyatv.scan.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_scans_share_one_discovery(agent):
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock, return_value=[]):
+        mock_pyatv.scan = AsyncMock(return_value=[])
+
+        first, second = await asyncio.gather(agent.scan(), agent.scan(refresh=True))
+        assert first is second
+        assert mock_pyatv.scan.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_by_name_reprobes_known_device_by_identifier(agent):
+    agent._devices_by_name = {"Apple TV": {
+        "name": "Apple TV", "address": "192.168.1.10", "identifier": "airplay-id-1",
+        "device_type": "airplay", "protocols": [],
+    }}
+    atv = MagicMock()
+    atv.name = "Apple TV"
+    atv.address = "192.168.1.11"
+    atv.identifier = "airplay-id-1"
+    atv.services = []
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "connect", new_callable=AsyncMock) as mock_connect:
+        mock_pyatv.scan = AsyncMock(return_value=[atv])
+        identifier, _ = await agent.connect_by_name("Apple TV")
+
+    assert identifier == "airplay-id-1"
+    assert mock_pyatv.scan.call_args.kwargs["identifier"] == "airplay-id-1"
+    assert mock_connect.call_args.args[1] == "192.168.1.11"
+
+
+@pytest.mark.asyncio
+async def test_connect_passes_scanned_airplay_config(agent):
+    atv = MagicMock()
+    atv.name = "Apple TV"
+    atv.address = "192.168.1.10"
+    atv.identifier = "airplay-id-1"
+    atv.services = []
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock, return_value=[]), \
+         patch("castmasta.agent.AirPlayBackend") as mock_backend_cls:
+        mock_pyatv.scan = AsyncMock(return_value=[atv])
+        mock_backend_cls.return_value.connect = AsyncMock()
+        await agent.connect_by_name("Apple TV")
+
+    assert mock_backend_cls.return_value.connect.call_args.kwargs["config"] is atv
+    assert mock_pyatv.scan.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_resolves_device_type_from_scan(agent):
+    info = MagicMock()
+    info.friendly_name = "Chromecast"
+    info.host = "192.168.1.20"
+    info.uuid = "cast-uuid-1"
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock, return_value=[info]), \
+         patch("castmasta.agent.GoogleCastBackend") as mock_cast_cls:
+        mock_pyatv.scan = AsyncMock(return_value=[])
+        mock_cast_cls.return_value.connect = AsyncMock()
+        await agent.scan()
+        backend = await agent.connect("cast-uuid-1", "192.168.1.20", "Chromecast")
+
+    assert backend is mock_cast_cls.return_value
+
+
+@pytest.mark.asyncio
+async def test_find_device_uses_fresh_scan_index(agent):
+    atv = MagicMock()
+    atv.name = "Apple TV"
+    atv.address = "192.168.1.10"
+    atv.identifier = "airplay-id-1"
+    atv.services = []
+    with patch("castmasta.agent.pyatv") as mock_pyatv, \
+         patch.object(agent, "_browse_cast", new_callable=AsyncMock, return_value=[]):
+        mock_pyatv.scan = AsyncMock(return_value=[atv])
+        await agent.scan()
+        dev = await agent.find_device("Apple TV")
+        missing = await agent.find_device("Kitchen")
+
+    assert dev["identifier"] == "airplay-id-1"
+    assert missing is None
+    assert mock_pyatv.scan.call_count == 2  # only the unknown name rescans
+
+
+@pytest.mark.asyncio
+async def test_pair_reuses_open_session(agent):
+    handler = MagicMock()
+    handler.has_paired = False
+    handler.device_provides_pin = True
+    handler.begin = AsyncMock()
+    handler.close = AsyncMock()
+    with patch("pyatv.pair", new_callable=AsyncMock, return_value=handler) as mock_pair:
+        await agent.pair("id1", "192.168.1.10", "Apple TV")
+        await agent.pair("id1", "192.168.1.10", "Apple TV")
+    mock_pair.assert_called_once()
+    handler.begin.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_pair_rejects_unsupported_protocol(agent):
+    from pyatv.const import Protocol
+    with pytest.raises(ValueError, match="Unsupported protocol"):
+        await agent.pair("id1", "192.168.1.10", "Apple TV", Protocol.RAOP)
+
+
+@pytest.mark.asyncio
+async def test_pair_with_pin_saves_credentials_and_closes(agent):
+    handler = MagicMock()
+    handler.has_paired = True
+    handler.device_provides_pin = True
+    handler.begin = AsyncMock()
+    handler.finish = AsyncMock()
+    handler.close = AsyncMock()
+    handler.service.credentials = "creds"
+    with patch("pyatv.pair", new_callable=AsyncMock, return_value=handler):
+        await agent.pair("id1", "192.168.1.10", "Apple TV")
+    assert await agent.pair_with_pin("id1", "192.168.1.10", "Apple TV", "1234")
+    handler.close.assert_called_once()
+    assert agent.credentials.get("id1", "AirPlay") == "creds"
+    assert not agent._pairing_handlers
+
+
+@pytest.mark.asyncio
+async def test_pair_session_expires(agent, monkeypatch):
+    monkeypatch.setattr("castmasta.agent.PAIRING_SESSION_TTL", 0.01)
+    handler = MagicMock()
+    handler.has_paired = False
+    handler.device_provides_pin = True
+    handler.begin = AsyncMock()
+    handler.close = AsyncMock()
+    with patch("pyatv.pair", new_callable=AsyncMock, return_value=handler):
+        await agent.pair("id1", "192.168.1.10", "Apple TV")
+    await asyncio.sleep(0.05)
+    handler.close.assert_awaited_once()
+    assert not agent._pairing_handlers
+    with pytest.raises(ValueError, match="No active pairing session"):
+        await agent.pair_with_pin("id1", "192.168.1.10", "Apple TV", "1234")
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_pairing_sessions(agent):
+    handler = MagicMock()
+    handler.has_paired = False
+    handler.device_provides_pin = True
+    handler.begin = AsyncMock()
+    handler.close = AsyncMock()
+    with patch("pyatv.pair", new_callable=AsyncMock, return_value=handler):
+        await agent.pair("id1", "192.168.1.10", "Apple TV")
+    await agent.aclose()
+    handler.close.assert_awaited_once()
+    assert not agent._pairing_handlers
+
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_pending_credentials(agent):
+    import json
+
+    agent.credentials.set("id1", "AirPlay", "secret")  # debounced inside the loop
+    await agent.aclose()
+    saved = json.loads(Path(agent.credentials.storage_path).read_text())
+    assert saved["id1"]["AirPlay"] == "secret"
+
+
 def test_get_backend_not_connected(agent):
     with pytest.raises(ValueError, match="not connected"):
         agent._get_backend("nonexistent")
@@ -68,14 +321,14 @@ async def test_play_dispatches_to_backend(agent, mock_airplay_backend):
 async def test_volume_up(agent, mock_airplay_backend):
     agent.devices["dev1"] = mock_airplay_backend
     await agent.volume_up("dev1", 0.2)
-    mock_airplay_backend.set_volume.assert_called_once_with(0.7)
+    mock_airplay_backend.change_volume.assert_called_once_with(0.2)
 
 
 @pytest.mark.asyncio
 async def test_volume_down(agent, mock_airplay_backend):
     agent.devices["dev1"] = mock_airplay_backend
     await agent.volume_down("dev1", 0.3)
-    mock_airplay_backend.set_volume.assert_called_once_with(0.2)
+    mock_airplay_backend.change_volume.assert_called_once_with(-0.3)
 
 
 @pytest.mark.asyncio
@@ -85,6 +338,12 @@ async def test_send_key_on_cast_raises(agent, mock_cast_backend):
         await agent.send_key("dev1", "up")
 
 
+@pytest.mark.asyncio
+async def test_send_key_rejects_unknown_key_before_lookup(agent):
+    with pytest.raises(ValueError, match="Unknown key"):
+        await agent.send_key("not-connected", "volume_up")
+
+
 @pytest.mark.asyncio
 async def test_send_key_on_airplay(agent, mock_airplay_backend):
     mock_airplay_backend.send_key = AsyncMock()
@@ -103,6 +362,17 @@ def test_validate_volume_rejects_out_of_range(agent):
         agent._validate_volume(1.5)
 
 
+@pytest.mark.parametrize("value", [True, "0.5", float("inf"), float("-inf"), float("nan")])
+def test_validate_delta_rejects_non_finite_numbers(agent, value):
+    with pytest.raises(ValueError, match="finite number"):
+        agent._validate_delta(value)
+
+
+def test_validate_delta_rejects_zero(agent):
+    with pytest.raises(ValueError, match="between"):
+        agent._validate_delta(0)
+
+
 @pytest.mark.asyncio
 async def test_disconnect(agent, mock_airplay_backend):
     agent.devices["dev1"] = mock_airplay_backend
@@ -119,6 +389,16 @@ async def test_disconnect_all(agent, mock_airplay_backend, mock_cast_backend):
     assert len(agent.devices) == 0
 
 
+@pytest.mark.asyncio
+async def test_disconnect_all_continues_after_failure(agent, mock_airplay_backend, mock_cast_backend):
+    mock_airplay_backend.disconnect.side_effect = RuntimeError("socket closed")
+    agent.devices["dev1"] = mock_airplay_backend
+    agent.devices["dev2"] = mock_cast_backend
+    await agent.disconnect_all()
+    mock_cast_backend.disconnect.assert_called_once()
+    assert len(agent.devices) == 0
+
+
 @pytest.mark.asyncio
 async def test_play_url_validates_scheme(agent, mock_airplay_backend):
     agent.devices["dev1"] = mock_airplay_backend
@@ -135,6 +415,58 @@ async def test_stream_file_validates_extension(agent, mock_airplay_backend, tmp_
         await agent.stream_file("dev1", str(bad_file))
 
 
+@pytest.mark.asyncio
+async def test_stream_file_rejects_symlink(agent, mock_airplay_backend, tmp_path):
+    agent.devices["dev1"] = mock_airplay_backend
+    target = tmp_path / "real.mp3"
+    target.write_bytes(b"audio")
+    link = tmp_path / "link.mp3"
+    link.symlink_to(target)
+    with pytest.raises(ValueError, match="Symlinks"):
+        await agent.stream_file("dev1", str(link))
+
+
+def test_validate_media_file_resolves_parent_symlinks(agent, tmp_path):
+    real_dir = tmp_path / "real"
+    real_dir.mkdir()
+    (real_dir / "song.mp3").write_bytes(b"audio")
+    (tmp_path / "alias").symlink_to(real_dir)
+    path = agent._validate_media_file(str(tmp_path / "alias" / "song.mp3"))
+    assert path == (real_dir / "song.mp3").resolve()
+
+
+@pytest.mark.asyncio
+async def test_stream_file_rejects_missing_and_directories(agent, mock_airplay_backend, tmp_path):
+    agent.devices["dev1"] = mock_airplay_backend
+    with pytest.raises(FileNotFoundError):
+        await agent.stream_file("dev1", str(tmp_path / "missing.mp3"))
+    (tmp_path / "dir.mp3").mkdir()
+    with pytest.raises(FileNotFoundError):
+        await agent.stream_file("dev1", str(tmp_path / "dir.mp3"))
+
+
+@pytest.mark.asyncio
+async def test_display_image_encodes_still_at_one_fps(agent, mock_cast_backend, tmp_path):
+    agent.devices["dev1"] = mock_cast_backend
+    image = tmp_path / "photo.png"
+    image.write_bytes(b"png")
+
+    mock_proc = MagicMock()
+    mock_proc.returncode = 0
+    mock_proc.communicate = AsyncMock(return_value=(None, b""))
+
+    with patch("castmasta.agent.asyncio.create_subprocess_exec", return_value=mock_proc) as mock_exec:
+        await agent.display_image("dev1", str(image), duration=60)
+        await agent.display_image("dev1", str(image), duration=60)
+
+    mock_exec.assert_called_once()
+    args = mock_exec.call_args.args
+    assert args[args.index("-framerate") + 1] == "1"
+    assert args[args.index("-tune") + 1] == "stillimage"
+    assert args[args.index("-t") + 1] == "60"
+    assert mock_cast_backend.stream_file.call_count == 2
+
+
 @pytest.fixture(autouse=False)
 def no_prepend_silence():
     """Patch _prepend_silence so announce tests don't need real WAV data."""
@@ -168,27 +500,64 @@ async def test_announce_streams_wav(agent, mock_airplay_backend, tmp_path, no_pr
 
 
 @pytest.mark.asyncio
-async def test_announce_cleans_up_temp_file_on_success(agent, mock_airplay_backend, no_prepend_silence):
-    """Temp WAV file is deleted after streaming."""
+async def test_announce_keeps_cached_wav_and_no_temp_files(agent, mock_airplay_backend, no_prepend_silence):
+    """The rendered WAV stays in the media cache; render temp files are gone."""
     agent.devices["dev1"] = mock_airplay_backend
 
-    captured_path = []
-
     mock_proc = MagicMock()
     mock_proc.returncode = 0
     mock_proc.communicate = AsyncMock(return_value=(None, b""))
 
     async def fake_exec(*args, **kwargs):
         output_path = args[args.index("--output_file") + 1]
-        captured_path.append(output_path)
         Path(output_path).write_bytes(b"fake wav")
         return mock_proc
 
     with patch("castmasta.agent.asyncio.create_subprocess_exec", side_effect=fake_exec):
         await agent.announce("dev1", "Hello")
 
-    assert captured_path, "No temp file path captured"
-    assert not Path(captured_path[0]).exists(), "Temp file was not cleaned up"
+    streamed = Path(mock_airplay_backend.stream_file.call_args.args[0])
+    assert streamed.parent == agent.media_cache.root / "tts"
+    assert streamed.read_bytes() == b"fake wav"
+    assert [p.name for p in streamed.parent.iterdir()] == [streamed.name]
+
+
+@pytest.mark.asyncio
+async def test_announce_reuses_cached_speech(agent, mock_airplay_backend, no_prepend_silence):
+    agent.devices["dev1"] = mock_airplay_backend
+
+    mock_proc = MagicMock()
+    mock_proc.returncode = 0
+    mock_proc.communicate = AsyncMock(return_value=(None, b""))
+
+    with patch("castmasta.agent.asyncio.create_subprocess_exec", return_value=mock_proc) as mock_exec:
+        await agent.announce("dev1", "Lights out")
+        await agent.announce("dev1", "Lights out")
+
+    mock_exec.assert_called_once()
+    first, second = (c.args[0] for c in mock_airplay_backend.stream_file.call_args_list)
+    assert first == second
+    assert Path(first).exists()
+
+
+@pytest.mark.asyncio
+async def test_cached_media_is_protected_while_streaming(agent, mock_airplay_backend, no_prepend_silence):
+    agent.devices["dev1"] = mock_airplay_backend
+    seen = []
+
+    async def stream_file(path):
+        seen.append(Path(path) in agent._media_in_use())
+
+    mock_airplay_backend.stream_file = AsyncMock(side_effect=stream_file)
+    mock_proc = MagicMock()
+    mock_proc.returncode = 0
+    mock_proc.communicate = AsyncMock(return_value=(None, b""))
+
+    with patch("castmasta.agent.asyncio.create_subprocess_exec", return_value=mock_proc):
+        await agent.announce("dev1", "Lights out")
+
+    assert seen == [True]
+    assert not agent._media_in_use()
 
 
 @pytest.mark.asyncio
@@ -205,6 +574,14 @@ async def test_announce_raises_on_invalid_voice(agent, mock_airplay_backend):
         await agent.announce("dev1", "Hello", voice="../evil/path")
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("voice", ["en_US-lessac\n", "en_US lessac", "vöice"])
+async def test_announce_rejects_voice_with_other_characters(agent, mock_airplay_backend, voice):
+    agent.devices["dev1"] = mock_airplay_backend
+    with pytest.raises(ValueError, match="voice"):
+        await agent.announce("dev1", "Hello", voice=voice)
+
+
 @pytest.mark.asyncio
 async def test_announce_raises_on_piper_failure(agent, mock_airplay_backend):
     agent.devices["dev1"] = mock_airplay_backend
@@ -303,3 +680,17 @@ def test_prepend_silence_adds_frames(tmp_path):
         total = w.getnframes()
 
     assert total == original_frames + framerate  # 1 second of silence added
+
+
+@pytest.mark.asyncio
+async def test_play_url_accepts_uppercase_scheme(agent, mock_airplay_backend):
+    agent.devices["dev1"] = mock_airplay_backend
+    await agent.play_url("dev1", "HTTPS://example.com/a.mp4")
+    mock_airplay_backend.play_url.assert_called_once_with("HTTPS://example.com/a.mp4")
+
+
+@pytest.mark.asyncio
+async def test_play_url_requires_hostname(agent, mock_airplay_backend):
+    agent.devices["dev1"] = mock_airplay_backend
+    with pytest.raises(ValueError, match="hostname"):
+        await agent.play_url("dev1", "http:///a.mp4")
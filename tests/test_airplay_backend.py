@@ -21,8 +21,7 @@ def mock_atv():
     return atv
 
 
-@pytest.mark.asyncio
-async def test_device_type(backend):
+def test_device_type(backend):
     assert backend.device_type == "airplay"
 
 
@@ -41,6 +40,61 @@ async def test_connect(backend):
         assert backend._atv is mock_atv_instance
 
 
+@pytest.mark.asyncio
+async def test_connect_loads_stored_credentials():
+    from pyatv.const import Protocol
+    store = MagicMock()
+    store.get_all.return_value = {"AirPlay": "ap-creds", "Companion": "comp-creds"}
+    backend = AirPlayBackend(credentials=store)
+    mock_target = MagicMock()
+    mock_target.name = "Test TV"
+
+    with patch("castmasta.airplay_backend.pyatv.scan", new_callable=AsyncMock) as mock_scan, \
+         patch("castmasta.airplay_backend.pyatv.connect", new_callable=AsyncMock):
+        mock_scan.return_value = [mock_target]
+        await backend.connect("id1", "192.168.1.100", "Test TV")
+
+    store.get_all.assert_called_once_with("id1")
+    mock_target.set_credentials.assert_any_call(Protocol.AirPlay, "ap-creds")
+    mock_target.set_credentials.assert_any_call(Protocol.Companion, "comp-creds")
+    assert mock_target.set_credentials.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_connect_with_scanned_config_skips_scan(backend):
+    config = MagicMock()
+    config.address = "192.168.1.100"
+    mock_atv_instance = MagicMock()
+
+    with patch("castmasta.airplay_backend.pyatv.scan", new_callable=AsyncMock) as mock_scan, \
+         patch("castmasta.airplay_backend.pyatv.connect", new_callable=AsyncMock) as mock_connect:
+        mock_connect.return_value = mock_atv_instance
+        await backend.connect("id1", "192.168.1.100", "Test TV", config=config)
+
+    mock_scan.assert_not_called()
+    assert mock_connect.call_args.args[0] is config
+    assert backend._atv is mock_atv_instance
+
+
+@pytest.mark.asyncio
+async def test_connect_rescans_when_scanned_config_fails(backend):
+    config = MagicMock()
+    config.address = "192.168.1.100"
+    fresh = MagicMock()
+    fresh.name = "Test TV"
+    mock_atv_instance = MagicMock()
+
+    with patch("castmasta.airplay_backend.pyatv.scan", new_callable=AsyncMock) as mock_scan, \
+         patch("castmasta.airplay_backend.pyatv.connect", new_callable=AsyncMock) as mock_connect:
+        mock_scan.return_value = [fresh]
+        mock_connect.side_effect = [OSError("refused"), mock_atv_instance]
+        await backend.connect("id1", "192.168.1.100", "Test TV", config=config)
+
+    mock_scan.assert_called_once()
+    assert mock_connect.call_args.args[0] is fresh
+    assert backend._atv is mock_atv_instance
+
+
 @pytest.mark.asyncio
 async def test_disconnect(backend):
     backend._atv = MagicMock()
@@ -103,3 +157,35 @@ async def test_seek(backend, mock_atv):
     backend._atv = mock_atv
     await backend.seek(30.0)
     mock_atv.remote_control.set_position.assert_called_once_with(30.0)
+
+
+@pytest.mark.asyncio
+async def test_send_key(backend, mock_atv):
+    backend._atv = mock_atv
+    await backend.send_key("play_pause")
+    mock_atv.remote_control.play_pause.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_key_rejects_unknown_key(backend, mock_atv):
+    backend._atv = mock_atv
+    with pytest.raises(ValueError, match="Unknown key"):
+        await backend.send_key("__init__")
+
+
+@pytest.mark.asyncio
+async def test_now_playing(backend, mock_atv):
+    playing = MagicMock()
+    playing.media_type.name = "Music"
+    playing.device_state.name = "Playing"
+    playing.title = "Song"
+    playing.artist = "Artist"
+    playing.album = "Album"
+    playing.position = 12
+    playing.total_time = 200
+    mock_atv.metadata.playing = AsyncMock(return_value=playing)
+    backend._atv = mock_atv
+    assert await backend.now_playing() == {
+        "media_type": "Music", "device_state": "Playing", "title": "Song",
+        "artist": "Artist", "album": "Album", "position": 12, "total_time": 200,
+    }
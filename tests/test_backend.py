@@ -1,7 +1,35 @@
 import pytest
+from unittest.mock import AsyncMock
 from castmasta.backend import DeviceBackend
 
 
 def test_cannot_instantiate_abc():
     with pytest.raises(TypeError, match="abstract"):
         DeviceBackend()
+
+
+class _VolumeBackend(DeviceBackend):
+    device_type = "test"
+
+    def __init__(self, volume):
+        self.volume = volume
+        self.set_volume = AsyncMock()
+
+    async def get_volume(self):
+        return self.volume
+
+    set_volume = connect = disconnect = stream_file = play_url = play = pause = stop = None
+    seek = now_playing = power_on = power_off = get_power_state = None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("volume, delta, expected", [
+    (0.5, 0.2, 0.7),
+    (0.5, -0.3, 0.2),
+    (0.95, 0.1, 1.0),
+    (0.05, -0.1, 0.0),
+])
+async def test_change_volume_clamps(volume, delta, expected):
+    backend = _VolumeBackend(volume)
+    await backend.change_volume(delta)
+    backend.set_volume.assert_called_once_with(pytest.approx(expected))
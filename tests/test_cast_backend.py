@@ -43,14 +43,112 @@ def mock_cast_device():
 
 @pytest.fixture
 def backend():
-    return GoogleCastBackend(file_server_port=18095)
+    return GoogleCastBackend(file_server_port=0)
 
 
-@pytest.mark.asyncio
-async def test_device_type(backend):
+def test_device_type(backend):
     assert backend.device_type == "googlecast"
 
 
+def _cast_info(host="192.168.1.50"):
+    import uuid
+    from pychromecast.models import CastInfo
+    return CastInfo(
+        set(), uuid.UUID(int=1), "Chromecast", "Living Room", host, 8009, "cast", "Google",
+    )
+
+
+@pytest.mark.asyncio
+async def test_connect_with_scanned_info_skips_discovery(backend, mock_cast_device):
+    with patch("castmasta.cast_backend.pychromecast") as mock_pcc:
+        mock_pcc.Chromecast.return_value = mock_cast_device
+        await backend.connect(
+            "test-uuid-123", "192.168.1.50", "Living Room", cast_info=_cast_info(),
+        )
+
+    mock_pcc.get_listed_chromecasts.assert_not_called()
+    dialled = mock_pcc.Chromecast.call_args.kwargs["cast_info"]
+    assert {(s.host, s.port) for s in dialled.services} == {("192.168.1.50", 8009)}
+    assert backend._cast is mock_cast_device
+
+
+@pytest.mark.asyncio
+async def test_connect_falls_back_to_discovery(backend, mock_cast_device):
+    unreachable = MagicMock()
+    unreachable.wait.side_effect = OSError("unreachable")
+    with patch("castmasta.cast_backend.pychromecast") as mock_pcc:
+        mock_pcc.Chromecast.return_value = unreachable
+        mock_pcc.get_listed_chromecasts.return_value = ([mock_cast_device], MagicMock())
+        await backend.connect(
+            "test-uuid-123", "192.168.1.50", "Living Room", cast_info=_cast_info(),
+        )
+
+    unreachable.disconnect.assert_called_once()
+    assert backend._cast is mock_cast_device
+
+
+@pytest.mark.asyncio
+async def test_change_volume_uses_cached_status(backend, mock_cast_device):
+    backend._cast = mock_cast_device
+    await backend.change_volume(0.6)
+    mock_cast_device.set_volume.assert_called_once_with(1.0)
+
+
+@pytest.mark.asyncio
+async def test_connect_dials_address_without_scan_info(backend, mock_cast_device):
+    identifier = "00000000-0000-0000-0000-000000000001"
+    with patch("castmasta.cast_backend.pychromecast") as mock_pcc:
+        mock_pcc.Chromecast.return_value = mock_cast_device
+        await backend.connect(identifier, "192.168.1.50", "Living Room")
+
+    mock_pcc.get_listed_chromecasts.assert_not_called()
+    dialled = mock_pcc.Chromecast.call_args.kwargs["cast_info"]
+    assert str(dialled.uuid) == identifier
+    assert {(s.host, s.port) for s in dialled.services} == {("192.168.1.50", 8009)}
+
+
+@pytest.mark.asyncio
+async def test_connect_not_found_stops_discovery(backend):
+    browser = MagicMock()
+    with patch("castmasta.cast_backend.pychromecast") as mock_pcc:
+        mock_pcc.get_listed_chromecasts.return_value = ([], browser)
+        with pytest.raises(ValueError, match="not found"):
+            await backend.connect("not-a-uuid", "192.168.1.50", "Living Room")
+
+    mock_pcc.Chromecast.assert_not_called()
+    browser.stop_discovery.assert_called_once()
+    assert backend._browser is None
+
+
+@pytest.mark.asyncio
+async def test_shared_file_server_outlives_backend(mock_cast_device):
+    file_server = MagicMock()
+    file_server.serve_file = AsyncMock(return_value="http://host/media/tok/a.mp4")
+    file_server.shutdown = AsyncMock()
+    backend = GoogleCastBackend(file_server=file_server)
+    backend._cast = mock_cast_device
+
+    await backend.stream_file("/tmp/a.mp4")
+    file_server.serve_file.assert_called_once_with("/tmp/a.mp4", "video/mp4")
+    await backend.stop()
+    file_server.release.assert_called_once_with("http://host/media/tok/a.mp4")
+    await backend.disconnect()
+    file_server.shutdown.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_tears_everything_down(backend, mock_cast_device):
+    browser = MagicMock()
+    backend._cast = mock_cast_device
+    backend._browser = browser
+    with patch.object(backend._file_server, "shutdown", new_callable=AsyncMock) as shutdown:
+        await backend.disconnect()
+    mock_cast_device.disconnect.assert_called_once()
+    browser.stop_discovery.assert_called_once()
+    shutdown.assert_awaited_once()
+    assert backend._cast is None and backend._browser is None
+
+
 @pytest.mark.asyncio
 async def test_play(backend, mock_cast_device):
     backend._cast = mock_cast_device
@@ -0,0 +1,63 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+from click.testing import CliRunner
+
+from castmasta.cli import cli
+
+
+def test_tools_prints_json():
+    result = CliRunner().invoke(cli, ["tools"], obj={})
+    assert result.exit_code == 0
+    assert isinstance(json.loads(result.output), list)
+
+
+def test_shell_runs_lines_and_reports_errors():
+    script = "# comment\n\ntools\nno-such-command\nexit\ntools\n"
+    result = CliRunner().invoke(cli, ["shell"], input=script, obj={})
+    assert result.exit_code == 0
+    assert result.output.count('"send_key"') == 1  # tools ran once, before exit
+    assert "No such command" in result.output
+
+
+def test_shell_refuses_to_nest():
+    result = CliRunner().invoke(cli, ["shell"], input="shell\n", obj={})
+    assert result.exit_code == 0
+    assert "cannot be nested" in result.output
+
+
+def test_closes_agent_on_exit():
+    agent = MagicMock()
+    agent.aclose = AsyncMock()
+    result = CliRunner().invoke(cli, ["tools"], obj={"agent": agent})
+    assert result.exit_code == 0
+    agent.aclose.assert_awaited_once()
+
+
+def test_shared_loop_is_installed_and_reset(monkeypatch):
+    import asyncio
+
+    from castmasta import cli as cli_module
+
+    installed = []
+    real_set_event_loop = asyncio.set_event_loop
+
+    def spy(loop):
+        installed.append(loop)
+        real_set_event_loop(loop)
+
+    monkeypatch.setattr(asyncio, "set_event_loop", spy)
+    seen = []
+
+    @cli_module.cli.command("probe-loop")
+    @cli_module.click.pass_context
+    def probe_loop(ctx):
+        seen.append(asyncio.get_event_loop() is ctx.obj["loop"])
+
+    try:
+        result = CliRunner().invoke(cli, ["probe-loop"], obj={})
+    finally:
+        cli_module.cli.commands.pop("probe-loop")
+    assert result.exit_code == 0
+    assert seen == [True]
+    assert installed[-1] is None  # reset when the group closes
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import os
 import pytest
 from castmasta.credentials import CredentialStore
@@ -18,6 +20,16 @@ def test_get_missing(cred_store):
     assert cred_store.get("nonexistent", "AirPlay") is None
 
 
+def test_get_all(cred_store):
+    cred_store.set("dev1", "AirPlay", "secret1")
+    cred_store.set("dev1", "Companion", "secret2")
+    creds = cred_store.get_all("dev1")
+    assert creds == {"AirPlay": "secret1", "Companion": "secret2"}
+    creds.clear()
+    assert cred_store.get("dev1", "AirPlay") == "secret1"
+    assert cred_store.get_all("nonexistent") == {}
+
+
 def test_delete_specific_protocol(cred_store):
     cred_store.set("dev1", "AirPlay", "secret1")
     cred_store.set("dev1", "Companion", "secret2")
@@ -48,3 +60,109 @@ def test_file_permissions(tmp_path):
     store.set("dev1", "AirPlay", "secret123")
     stat = os.stat(path)
     assert oct(stat.st_mode & 0o777) == "0o600"
+
+
+def test_stores_share_parsed_credentials(tmp_path):
+    path = str(tmp_path / "creds.json")
+    store1 = CredentialStore(storage_path=path)
+    store2 = CredentialStore(storage_path=path)
+    store1.set("dev1", "AirPlay", "secret123")
+    assert store2.get("dev1", "AirPlay") == "secret123"
+
+
+def test_credentials_load_on_first_access(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(CredentialStore, "_load", lambda self: calls.append(1) or {})
+    store = CredentialStore(storage_path=str(tmp_path / "sub" / "creds.json"))
+    assert not calls
+    assert not (tmp_path / "sub").exists()
+    assert store.get("dev1", "AirPlay") is None
+    assert store.get("dev1", "Companion") is None
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_debounced_inside_event_loop(tmp_path):
+    path = tmp_path / "creds.json"
+    store = CredentialStore(storage_path=str(path))
+    store.set("dev1", "AirPlay", "secret1")
+    store.set("dev1", "Companion", "secret2")
+    assert not path.exists()
+    await store.aclose()
+    assert path.exists()
+    CredentialStore._loaded.clear()
+    reloaded = CredentialStore(storage_path=str(path))
+    assert reloaded.get("dev1", "Companion") == "secret2"
+
+
+def test_migrates_flat_keys(tmp_path):
+    path = tmp_path / "creds.json"
+    path.write_text(json.dumps({
+        "C2:BA:9F:70:DB:F7:AirPlay": "secret1",
+        "C2:BA:9F:70:DB:F7:Companion": "secret2",
+    }))
+    store = CredentialStore(storage_path=str(path))
+    assert store.get("C2:BA:9F:70:DB:F7", "AirPlay") == "secret1"
+    store.delete("C2:BA:9F:70:DB:F7")
+    assert store.get("C2:BA:9F:70:DB:F7", "Companion") is None
+
+
+@pytest.mark.asyncio
+async def test_debounced_flush_writes_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr("castmasta.credentials.FLUSH_DELAY", 0)
+    path = tmp_path / "creds.json"
+    store = CredentialStore(storage_path=str(path))
+    store.set("dev1", "AirPlay", "secret1")
+    await asyncio.sleep(0.01)
+    assert store._flush_task is not None
+    await store._flush_task
+    assert json.loads(path.read_text()) == {"dev1": {"AirPlay": "secret1"}}
+
+
+@pytest.mark.asyncio
+async def test_stores_sharing_a_path_never_write_concurrently(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    monkeypatch.setattr("castmasta.credentials.FLUSH_DELAY", 0)
+    active = 0
+    overlaps = []
+    lock = threading.Lock()
+    real_write = CredentialStore._write
+
+    def slow_write(self, credentials):
+        nonlocal active
+        with lock:
+            active += 1
+            overlaps.append(active > 1)
+        time.sleep(0.02)
+        try:
+            real_write(self, credentials)
+        finally:
+            with lock:
+                active -= 1
+
+    monkeypatch.setattr(CredentialStore, "_write", slow_write)
+    path = tmp_path / "creds.json"
+    first = CredentialStore(storage_path=str(path))
+    second = CredentialStore(storage_path=str(path))
+    first.set("dev1", "AirPlay", "secret1")
+    await asyncio.sleep(0.005)  # first store's write is now in flight
+    second.set("dev2", "AirPlay", "secret2")
+    await asyncio.sleep(0.005)
+    await first.aclose()
+    await second.aclose()
+
+    assert overlaps and not any(overlaps)
+    assert json.loads(path.read_text()) == {
+        "dev1": {"AirPlay": "secret1"}, "dev2": {"AirPlay": "secret2"},
+    }
+    assert [p.name for p in tmp_path.iterdir()] == ["creds.json"]
+
+
+def test_tightens_directory_permissions(tmp_path):
+    parent = tmp_path / "store"
+    parent.mkdir(mode=0o755)
+    os.chmod(parent, 0o755)
+    CredentialStore(storage_path=str(parent / "creds.json")).get("dev1", "AirPlay")
+    assert oct(os.stat(parent).st_mode & 0o777) == "0o700"
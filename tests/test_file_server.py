@@ -1,5 +1,7 @@
 import pytest
 import aiohttp
+from pathlib import Path
+from unittest.mock import patch
 from castmasta.file_server import FileServer
 
 
@@ -12,10 +14,10 @@ def media_file(tmp_path):
 
 @pytest.mark.asyncio
 async def test_server_starts_and_serves_file(media_file):
-    server = FileServer(port=18089)
+    server = FileServer(port=0, host="127.0.0.1")
     url = await server.serve_file(media_file)
-    assert "18089" in url
-    assert url.startswith("http://")
+    assert server.port != 0
+    assert url.startswith(f"http://127.0.0.1:{server.port}/media/")
 
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as resp:
@@ -26,13 +28,76 @@ async def test_server_starts_and_serves_file(media_file):
     await server.shutdown()
 
 
+@pytest.mark.asyncio
+async def test_server_honours_range_requests(media_file):
+    server = FileServer(port=0, host="127.0.0.1")
+    url = await server.serve_file(media_file)
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers={"Range": "bytes=5-7"}) as resp:
+            assert resp.status == 206
+            assert resp.headers["Content-Type"] == "video/mp4"
+            assert await resp.read() == b"mp4"
+
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_server_serves_several_files_on_one_runner(media_file, tmp_path):
+    other = tmp_path / "other track.mp3"
+    other.write_bytes(b"fake mp3 content")
+    server = FileServer(port=0, host="127.0.0.1")
+    first_url = await server.serve_file(media_file)
+    runner = server._runner
+    second_url = await server.serve_file(str(other))
+    assert server._runner is runner
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(first_url) as resp:
+            assert await resp.read() == b"fake mp4 content"
+        async with session.get(second_url) as resp:
+            assert await resp.read() == b"fake mp3 content"
+        server.release(first_url)
+        async with session.get(first_url) as resp:
+            assert resp.status == 404
+        async with session.get(second_url) as resp:
+            assert resp.status == 200
+
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_server_resolves_local_ip_once(media_file):
+    server = FileServer(port=0)
+    with patch("castmasta.file_server._get_local_ip", return_value="10.0.0.5") as mock_ip:
+        first = await server.serve_file(media_file)
+        second = await server.serve_file(media_file)
+    assert first.startswith(f"http://10.0.0.5:{server.port}/")
+    assert second.startswith(f"http://10.0.0.5:{server.port}/")
+    mock_ip.assert_called_once()
+
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_server_uses_given_content_type(media_file):
+    server = FileServer(port=0, host="127.0.0.1")
+    url = await server.serve_file(media_file, "audio/mp4")
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            assert resp.headers["Content-Type"] == "audio/mp4"
+
+    await server.shutdown()
+
+
 @pytest.mark.asyncio
 async def test_server_404_for_wrong_path(media_file):
-    server = FileServer(port=18090)
+    server = FileServer(port=0, host="127.0.0.1")
     await server.serve_file(media_file)
 
     async with aiohttp.ClientSession() as session:
-        async with session.get("http://127.0.0.1:18090/wrong") as resp:
+        async with session.get(f"http://127.0.0.1:{server.port}/wrong") as resp:
             assert resp.status == 404
 
     await server.shutdown()
@@ -40,7 +105,18 @@ async def test_server_404_for_wrong_path(media_file):
 
 @pytest.mark.asyncio
 async def test_server_shutdown_is_idempotent(media_file):
-    server = FileServer(port=18091)
+    server = FileServer(port=0, host="127.0.0.1")
     await server.serve_file(media_file)
     await server.shutdown()
+    assert server.port == 0
     await server.shutdown()  # should not raise
+
+
+@pytest.mark.asyncio
+async def test_served_paths_follow_release(media_file):
+    server = FileServer(port=0, host="127.0.0.1")
+    url = await server.serve_file(media_file)
+    assert server.served_paths() == {Path(media_file)}
+    server.release(url)
+    assert server.served_paths() == set()
+    await server.shutdown()
@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from castmasta import mcp_server
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_steps_in_order_and_reports_failures():
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.set_volume = AsyncMock()
+        agent.get_volume = AsyncMock(return_value=0.4)
+        results = await mcp_server.batch([
+            {"tool": "set_volume", "args": {"identifier": "dev", "volume": 0.4}},
+            {"tool": "no_such_tool"},
+            {"tool": "get_volume", "args": {"bogus": 1}},
+            {"tool": "batch", "args": {"ops": []}},
+            {"tool": "get_volume", "args": {"identifier": "dev"}},
+        ])
+    assert results[0] == "Volume set to 0.4"
+    assert results[1] == "Unknown tool 'no_such_tool'"
+    assert results[2].startswith("Invalid arguments for get_volume")
+    assert results[3] == "Unknown tool 'batch'"
+    assert results[4] == "Volume: 0.4"
+    agent.set_volume.assert_awaited_once_with("dev", 0.4)
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_malformed_steps_and_tool_errors():
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.scan = AsyncMock(side_effect=OSError("network down"))
+        agent.get_volume = AsyncMock(return_value=0.4)
+        results = await mcp_server.batch([
+            "get_volume",
+            {"tool": "scan_devices"},
+            {"tool": "get_volume", "args": None},
+            {"tool": "get_volume", "args": ["dev"]},
+            {"tool": "get_volume", "args": {"identifier": "dev"}},
+        ])
+    assert results[0].startswith("Invalid step")
+    assert results[1] == "scan_devices failed: network down"
+    assert results[2].startswith("Invalid arguments for get_volume")  # missing identifier
+    assert results[3] == "Invalid arguments for get_volume: args must be an object"
+    assert results[4] == "Volume: 0.4"
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_type_error_inside_tool_as_failure():
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        get_agent.return_value.scan = AsyncMock(side_effect=TypeError("bad response"))
+        results = await mcp_server.batch([{"tool": "scan_devices", "args": {"timeout": 1}}])
+    assert results == ["scan_devices failed: bad response"]
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_after_repeated_failures():
+    identifier = "breaker-dev"
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.get_volume = AsyncMock(side_effect=RuntimeError("timed out"))
+        for _ in range(mcp_server.BREAKER_THRESHOLD):
+            assert await mcp_server.get_volume(identifier) == f"Failed to get volume for {identifier}"
+        result = await mcp_server.get_volume(identifier)
+        assert result.startswith(f"Device {identifier} marked unreachable")
+        assert agent.get_volume.await_count == mcp_server.BREAKER_THRESHOLD
+
+        # Once the cooldown is over a call goes through, and success closes the breaker.
+        mcp_server._breaker._open_until[identifier] = 0
+        agent.get_volume = AsyncMock(return_value=0.5)
+        assert await mcp_server.get_volume(identifier) == "Volume: 0.5"
+        assert mcp_server._breaker.retry_after(identifier) == 0
+
+
+@pytest.mark.asyncio
+async def test_expected_errors_do_not_open_breaker():
+    identifier = "breaker-user-error"
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.set_volume = AsyncMock(side_effect=ValueError("Volume out of range"))
+        for _ in range(mcp_server.BREAKER_THRESHOLD + 1):
+            assert await mcp_server.set_volume(identifier, 2.0) == "Volume out of range"
+    assert mcp_server._breaker.retry_after(identifier) == 0
+
+
+def test_parse_protocol():
+    from pyatv.const import Protocol
+
+    assert mcp_server._parse_protocol("airplay") is Protocol.AirPlay
+    assert mcp_server._parse_protocol("companion") is Protocol.Companion
+    assert mcp_server._parse_protocol("raop") is None
+
+
+@pytest.mark.asyncio
+async def test_not_connected_errors_do_not_open_breaker():
+    identifier = "breaker-not-connected"
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.play = AsyncMock(side_effect=ValueError(f"Device '{identifier}' not connected"))
+        for _ in range(mcp_server.BREAKER_THRESHOLD + 1):
+            assert await mcp_server.play(identifier) == "Failed to start playback"
+    assert mcp_server._breaker.retry_after(identifier) == 0
+
+
+@pytest.mark.asyncio
+async def test_connect_and_disconnect_reset_breaker():
+    identifier = "breaker-reconnect"
+    with patch.object(mcp_server, "_get_agent") as get_agent:
+        agent = get_agent.return_value
+        agent.get_volume = AsyncMock(side_effect=RuntimeError("timed out"))
+        for _ in range(mcp_server.BREAKER_THRESHOLD):
+            await mcp_server.get_volume(identifier)
+        assert mcp_server._breaker.retry_after(identifier) > 0
+
+        backend = AsyncMock()
+        backend.device_type = "airplay"
+        agent.connect_by_name = AsyncMock(return_value=(identifier, backend))
+        await mcp_server.connect_device("Living Room")
+        assert mcp_server._breaker.retry_after(identifier) == 0
+
+        for _ in range(mcp_server.BREAKER_THRESHOLD):
+            await mcp_server.get_volume(identifier)
+        agent.disconnect = AsyncMock()
+        assert await mcp_server.disconnect_device(identifier) == f"Disconnected from {identifier}"
+        assert mcp_server._breaker.retry_after(identifier) == 0
+
+
+@pytest.mark.asyncio
+async def test_server_shutdown_closes_agent(monkeypatch):
+    from fastmcp import Client
+
+    agent = AsyncMock()
+    monkeypatch.setattr(mcp_server, "_agent", agent)
+    async with Client(mcp_server.mcp) as client:
+        await client.list_tools()
+        agent.aclose.assert_not_awaited()
+    agent.aclose.assert_awaited_once()
+
+
+def test_tool_definitions_cover_every_mcp_tool():
+    from castmasta.tools import get_tool_names
+
+    assert set(get_tool_names()) == {fn.__name__ for fn in mcp_server._TOOL_FUNCTIONS}
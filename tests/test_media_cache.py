@@ -0,0 +1,105 @@
+import asyncio
+import os
+import pytest
+from pathlib import Path
+from castmasta.media_cache import MediaCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MediaCache(tmp_path / "cache", max_bytes=1024)
+
+
+def _renderer(calls, data=b"media"):
+    async def render(out_path):
+        calls.append(out_path)
+        await asyncio.sleep(0)
+        Path(out_path).write_bytes(data)
+    return render
+
+
+def test_key_is_length_prefixed():
+    assert MediaCache.key(b"ab", b"c") != MediaCache.key(b"a", b"bc")
+
+
+@pytest.mark.asyncio
+async def test_hit_skips_render(cache):
+    calls = []
+    first = await cache.get_or_render("tts", "k", ".wav", _renderer(calls))
+    second = await cache.get_or_render("tts", "k", ".wav", _renderer(calls))
+    assert first == second
+    assert first.read_bytes() == b"media"
+    assert len(calls) == 1
+    assert not Path(calls[0]).exists()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_render_once(cache):
+    calls = []
+    paths = await asyncio.gather(
+        *(cache.get_or_render("tts", "k", ".wav", _renderer(calls)) for _ in range(3))
+    )
+    assert len(set(paths)) == 1
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_render_leaves_nothing(cache):
+    async def render(out_path):
+        Path(out_path).write_bytes(b"partial")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_render("tts", "k", ".wav", render)
+    assert list((cache.root / "tts").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(cache):
+    old = await cache.get_or_render("still", "old", ".mp4", _renderer([], b"x" * 600))
+    os.utime(old, (0, 0))
+    new = await cache.get_or_render("still", "new", ".mp4", _renderer([], b"x" * 600))
+    assert new.exists()
+    assert not old.exists()
+
+
+@pytest.mark.asyncio
+async def test_eviction_skips_files_in_use(tmp_path):
+    in_use = set()
+    cache = MediaCache(tmp_path / "cache", max_bytes=1024, in_use=lambda: in_use)
+    served = await cache.get_or_render("still", "served", ".mp4", _renderer([], b"x" * 600))
+    os.utime(served, (0, 0))
+    in_use.add(served)
+    new = await cache.get_or_render("still", "new", ".mp4", _renderer([], b"x" * 600))
+    assert served.exists()
+    assert new.exists()
+
+
+@pytest.mark.asyncio
+async def test_late_caller_waits_for_queued_render(cache):
+    calls = []
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def failing(out_path):
+        calls.append(out_path)
+        await asyncio.sleep(0)
+        raise RuntimeError("render failed")
+
+    async def slow(out_path):
+        calls.append(out_path)
+        started.set()
+        await release.wait()
+        Path(out_path).write_bytes(b"media")
+
+    first = asyncio.ensure_future(cache.get_or_render("tts", "k", ".wav", failing))
+    second = asyncio.ensure_future(cache.get_or_render("tts", "k", ".wav", slow))
+    with pytest.raises(RuntimeError):
+        await first
+    await started.wait()  # second is rendering after the first failed
+    late = asyncio.ensure_future(cache.get_or_render("tts", "k", ".wav", _renderer(calls)))
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == await late
+    assert len(calls) == 2  # the failed render and one successful one
+    assert not cache._locks
@@ -0,0 +1,26 @@
+import json
+import pytest
+from castmasta import serialization
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_round_trip(backend):
+    data = {"dev1": {"AirPlay": "secret"}, "position": 1.5}
+    assert serialization.loads(serialization.dumps(data)) == data
+
+
+def test_indent_uses_two_spaces(backend):
+    assert serialization.dumps({"a": 1}, indent=True) == b'{\n  "a": 1\n}'
+
+
+def test_loads_raises_json_decode_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        serialization.loads(b"{not json")
@@ -0,0 +1,14 @@
+import json
+from castmasta.tools import TOOLS, get_tool_names, get_tools_json
+
+
+def test_tool_names_match_definitions():
+    names = get_tool_names()
+    assert names == [tool["name"] for tool in TOOLS]
+    names.append("format_disk")
+    assert "format_disk" not in get_tool_names()
+
+
+def test_tools_json_is_cached():
+    assert get_tools_json() is get_tools_json()
+    assert json.loads(get_tools_json()) == TOOLS